@@ -0,0 +1,102 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from app.config import get_settings_version
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    value: Any
+    stored_at: float
+    expires_at: float
+    
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+    
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+class TTLCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._options: Optional[Callable[[], Tuple[int, float]]] = None
+        self._settings_version = 0
+    
+    @classmethod
+    def from_settings(cls, options: Callable[[], Tuple[int, float]]) -> "TTLCache":
+        cache = cls(*options())
+        cache._options = options
+        cache._settings_version = get_settings_version()
+        return cache
+    
+    def _sync_settings(self) -> None:
+        if self._options is None or self._settings_version == get_settings_version():
+            return
+        self._settings_version = get_settings_version()
+        self.maxsize, self.ttl = self._options()
+        self._evict()
+    
+    def _evict(self) -> None:
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get_entry(self, key: Hashable, allow_expired: bool = False) -> Optional[CacheEntry]:
+        self._sync_settings()
+        entry = self._entries.get(key)
+        if entry is None or (entry.expired and not allow_expired):
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> CacheEntry:
+        self._sync_settings()
+        now = time.monotonic()
+        entry = CacheEntry(value=value, stored_at=now, expires_at=now + (self.ttl if ttl is None else ttl))
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._evict()
+        return entry
+    
+    def pop(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Task"] = {}
+    
+    def __len__(self) -> int:
+        return len(self._calls)
+    
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: Hashable, task: "asyncio.Task") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
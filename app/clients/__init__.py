@@ -0,0 +1,125 @@
+import importlib.util
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Any, Optional, Set
+import httpx
+from app.config import get_config_value, get_settings_version
+
+logger = logging.getLogger(__name__)
+
+UPSTREAMS: Dict[str, Dict[str, Any]] = {
+    "aviaradar": {"timeout": 30.0, "max_connections": 50, "max_keepalive_connections": 20},
+    "openmeteo": {"timeout": 10.0, "max_connections": 20, "max_keepalive_connections": 10},
+    "twogis": {"timeout": 30.0, "max_connections": 20, "max_keepalive_connections": 10},
+    "openrouter": {"timeout": 60.0, "max_connections": 50, "max_keepalive_connections": 20},
+}
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_client_options: Dict[str, Dict[str, Any]] = {}
+_client_leases: Dict[httpx.AsyncClient, int] = {}
+_retired_clients: Set[httpx.AsyncClient] = set()
+_transport: Optional[httpx.AsyncBaseTransport] = None
+_clients_version = 0
+
+
+def _is_http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _get_client_options(name: str) -> Dict[str, Any]:
+    if name not in UPSTREAMS:
+        raise ValueError(f"Unknown upstream: {name}")
+    defaults = UPSTREAMS[name]
+    
+    timeout = float(get_config_value(f"http.{name}.timeout", defaults["timeout"]))
+    limits = httpx.Limits(
+        max_connections=int(get_config_value(f"http.{name}.max_connections", defaults["max_connections"])),
+        max_keepalive_connections=int(get_config_value(f"http.{name}.max_keepalive_connections", defaults["max_keepalive_connections"])),
+        keepalive_expiry=float(get_config_value(f"http.{name}.keepalive_expiry", 30.0))
+    )
+    
+    http2 = bool(get_config_value(f"http.{name}.http2", False))
+    if http2 and not _is_http2_available():
+        logger.warning(f"HTTP/2 для {name} включен в конфигурации, но пакет h2 не установлен (uv sync --extra http2). Используется HTTP/1.1")
+        http2 = False
+    
+    client_kwargs = {"timeout": timeout, "limits": limits, "http2": http2}
+    proxy = get_config_value(f"http.{name}.proxy", get_config_value(f"{name}.proxy", None))
+    if proxy:
+        client_kwargs["proxy"] = proxy
+    return client_kwargs
+
+
+def _build_client(
+    name: str,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+    options: Optional[Dict[str, Any]] = None
+) -> httpx.AsyncClient:
+    client_kwargs = dict(options if options is not None else _get_client_options(name))
+    if transport is not None:
+        client_kwargs.pop("proxy", None)
+        client_kwargs["transport"] = transport
+    return httpx.AsyncClient(**client_kwargs)
+
+
+async def init_http_clients(transport: Optional[httpx.AsyncBaseTransport] = None):
+    global _transport, _clients_version
+    _transport = transport
+    _clients_version = get_settings_version()
+    for name in UPSTREAMS:
+        if name not in _clients:
+            options = _get_client_options(name)
+            _clients[name] = _build_client(name, transport, options)
+            _client_options[name] = options
+
+
+async def _retire_client(client: httpx.AsyncClient):
+    if _client_leases.get(client):
+        _retired_clients.add(client)
+    else:
+        await client.aclose()
+
+
+async def _refresh_http_clients():
+    global _clients_version
+    _clients_version = get_settings_version()
+    for name, client in list(_clients.items()):
+        options = _get_client_options(name)
+        if options == _client_options.get(name):
+            continue
+        _clients[name] = _build_client(name, _transport, options)
+        _client_options[name] = options
+        logger.info(f"Настройки HTTP-клиента {name} изменились, пул соединений пересоздан")
+        await _retire_client(client)
+
+
+async def close_http_clients():
+    clients = [*_clients.values(), *_retired_clients]
+    _clients.clear()
+    _client_options.clear()
+    _retired_clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+@asynccontextmanager
+async def http_client(name: str) -> AsyncIterator[httpx.AsyncClient]:
+    if _clients and _clients_version != get_settings_version():
+        await _refresh_http_clients()
+    
+    client = _clients.get(name)
+    if client is None:
+        async with _build_client(name) as client:
+            yield client
+        return
+    
+    _client_leases[client] = _client_leases.get(client, 0) + 1
+    try:
+        yield client
+    finally:
+        _client_leases[client] -= 1
+        if not _client_leases[client]:
+            del _client_leases[client]
+            if client in _retired_clients:
+                _retired_clients.discard(client)
+                await client.aclose()
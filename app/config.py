@@ -1,34 +1,142 @@
 import json
+import logging
 import os
+import time
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
 
 CONFIG_PATH = Path(__file__).parent.parent / "config.json"
+RELOAD_CHECK_INTERVAL_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class OpenRouterSettings:
+    llm_base_url: str = "https://openrouter.ai/api/v1"
+    llm_api_key: str = ""
+    llm_model: str = "x-ai/grok-code-fast-1"
+    api_token: str = ""
+
+
+@dataclass(frozen=True)
+class TwoGisSettings:
+    api_key: str = ""
+
+
+@dataclass(frozen=True)
+class Settings:
+    raw: Dict[str, Any]
+    values: Dict[str, Any]
+    path: Optional[Path] = None
+    mtime: Optional[int] = None
+    openrouter: OpenRouterSettings = field(default_factory=OpenRouterSettings)
+    twogis: TwoGisSettings = field(default_factory=TwoGisSettings)
+    
+    def get(self, key_path: str, default: Any = None) -> Any:
+        value = self.values.get(key_path)
+        return value if value is not None else default
+    
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any], path: Optional[Path] = None, mtime: Optional[int] = None) -> "Settings":
+        values: Dict[str, Any] = {}
+        _flatten(raw, "", values)
+        return cls(
+            raw=raw,
+            values=values,
+            path=path,
+            mtime=mtime,
+            openrouter=_section(OpenRouterSettings, "openrouter", values),
+            twogis=_section(TwoGisSettings, "twogis", values)
+        )
+
+
+def _section(section_cls, name: str, values: Dict[str, Any]):
+    defaults = section_cls()
+    return section_cls(**{
+        key: values.get(f"{name}.{key}") or getattr(defaults, key)
+        for key in defaults.__dataclass_fields__
+    })
+
+
+def _flatten(value: Any, prefix: str, values: Dict[str, Any]):
+    if not isinstance(value, dict):
+        return
+    for key, item in value.items():
+        path = f"{prefix}{key}"
+        values[path] = item
+        _flatten(item, f"{path}.", values)
+
 
-_config: Dict[str, Any] = {}
+_settings: Optional[Settings] = None
+_override: Optional[Settings] = None
+_settings_version = 0
+_last_checked_at = 0.0
+
+
+def _read_mtime(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _reload_settings(previous: Optional[Settings] = None) -> Settings:
+    global _settings, _settings_version
+    path = CONFIG_PATH
+    mtime = _read_mtime(path)
+    raw: Dict[str, Any] = {}
+    if mtime is not None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            if previous is not None:
+                logger.error(f"Не удалось перечитать конфигурацию {path}, используется предыдущая версия: {e}")
+                _settings = replace(previous, mtime=mtime)
+                return _settings
+            raise
+        if previous is not None:
+            logger.info(f"Конфигурация {path} перечитана")
+    
+    settings = Settings.from_dict(raw, path, mtime)
+    _settings = settings
+    _settings_version += 1
+    return settings
+
+
+def set_settings(settings: Optional[Settings]):
+    global _override, _settings_version
+    _override = settings
+    _settings_version += 1
+
+
+def get_settings() -> Settings:
+    global _last_checked_at
+    if _override is not None:
+        return _override
+    
+    settings = _settings
+    if settings is None or settings.path != CONFIG_PATH:
+        return _reload_settings()
+    
+    now = time.monotonic()
+    if now - _last_checked_at >= RELOAD_CHECK_INTERVAL_SECONDS:
+        _last_checked_at = now
+        if _read_mtime(CONFIG_PATH) != settings.mtime:
+            return _reload_settings(settings)
+    return settings
+
+
+def get_settings_version() -> int:
+    get_settings()
+    return _settings_version
 
 
 def load_config() -> Dict[str, Any]:
-    global _config
-    if not _config:
-        if CONFIG_PATH.exists():
-            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                _config = json.load(f)
-        else:
-            _config = {}
-    return _config
+    return get_settings().raw
 
 
 def get_config_value(key_path: str, default: Any = None) -> Any:
-    config = load_config()
-    keys = key_path.split(".")
-    value = config
-    for key in keys:
-        if isinstance(value, dict):
-            value = value.get(key)
-            if value is None:
-                return default
-        else:
-            return default
-    return value if value is not None else default
-
+    return get_settings().get(key_path, default)
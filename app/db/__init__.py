@@ -1,9 +1,19 @@
 import aiosqlite
+import asyncio
+import logging
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import AsyncIterator, List, Optional, Set, Tuple
+from app.config import get_config_value, get_settings_version
+
+logger = logging.getLogger(__name__)
 
 DB_DIR = Path(__file__).parent
 
+SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+JOURNAL_MODES = {"WAL", "DELETE", "TRUNCATE", "PERSIST"}
+
 
 def get_db_path():
     db_name = os.getenv("TEST_DB_NAME", "db.db")
@@ -13,10 +23,39 @@ def get_db_path():
 DB_PATH = get_db_path()
 
 
+def _get_journal_mode() -> str:
+    mode = str(get_config_value("db.journal_mode", "WAL")).upper()
+    return mode if mode in JOURNAL_MODES else "WAL"
+
+
+def _get_connection_pragmas() -> List[str]:
+    synchronous = str(get_config_value("db.synchronous", "NORMAL")).upper()
+    if synchronous not in SYNCHRONOUS_MODES:
+        synchronous = "NORMAL"
+    return [
+        f"PRAGMA synchronous = {synchronous}",
+        f"PRAGMA cache_size = {int(get_config_value('db.cache_size', -20000))}",
+        f"PRAGMA mmap_size = {int(get_config_value('db.mmap_size', 268435456))}",
+        f"PRAGMA busy_timeout = {int(get_config_value('db.busy_timeout', 5000))}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+
+
+async def _open_connection(read_only: bool = False) -> aiosqlite.Connection:
+    conn = await aiosqlite.connect(str(get_db_path()))
+    for pragma in _get_connection_pragmas():
+        await conn.execute(pragma)
+    if read_only:
+        await conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
 async def init_db():
     db_path = get_db_path()
     
     async with aiosqlite.connect(str(db_path)) as conn:
+        await conn.execute(f"PRAGMA journal_mode = {_get_journal_mode()}")
+        
         await conn.execute("""
             CREATE TABLE IF NOT EXISTS flights (
                 flight_id TEXT PRIMARY KEY,
@@ -35,16 +74,210 @@ async def init_db():
         """)
         
         await conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_flight_type ON flights(flight_type)
+            DROP INDEX IF EXISTS idx_flight_type
+        """)
+        
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_flights_type_scheduled
+            ON flights(flight_type, scheduled_time, flight_id)
+        """)
+        
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_flights_delayed
+            ON flights(flight_type, scheduled_time, flight_id)
+            WHERE delay_minutes > 0
         """)
         
         await conn.execute("""
             CREATE INDEX IF NOT EXISTS idx_updated_at ON flights(updated_at)
         """)
         
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS flight_fingerprints (
+                flight_id TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                live INTEGER NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_fingerprints_updated_at ON flight_fingerprints(updated_at)
+        """)
+        
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS leases (
+                name TEXT PRIMARY KEY,
+                holder TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS data_versions (
+                name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+        """)
+        
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS ingestion_cycles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at TEXT NOT NULL,
+                cycle TEXT NOT NULL
+            )
+        """)
+        
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocoding_cache (
+                key TEXT PRIMARY KEY,
+                lat REAL,
+                lon REAL,
+                error TEXT,
+                expires_at REAL NOT NULL
+            )
+        """)
+        
         await conn.commit()
 
 
 async def get_db_connection():
-    db_path = get_db_path()
-    return await aiosqlite.connect(str(db_path))
+    return await _open_connection()
+
+
+async def bump_data_version(conn: aiosqlite.Connection, name: str):
+    await conn.execute("""
+        INSERT INTO data_versions (name, version) VALUES (?, 1)
+        ON CONFLICT(name) DO UPDATE SET version = version + 1
+    """, (name,))
+
+
+async def get_data_version(name: str) -> int:
+    async with reader_connection() as conn:
+        cursor = await conn.execute("SELECT version FROM data_versions WHERE name = ?", (name,))
+        row = await cursor.fetchone()
+    return row[0] if row else 0
+
+
+def _get_pool_options() -> Tuple[int, Tuple[str, ...]]:
+    return max(1, int(get_config_value("db.readers", 4))), tuple(_get_connection_pragmas())
+
+
+class DatabasePool:
+    def __init__(self, writer: aiosqlite.Connection, readers: List[aiosqlite.Connection], options: Optional[Tuple] = None):
+        self.writer = writer
+        self.readers = readers
+        self.options = options
+        self.writer_lock = asyncio.Lock()
+        self.idle_readers: asyncio.Queue = asyncio.Queue()
+        for reader in readers:
+            self.idle_readers.put_nowait(reader)
+    
+    async def close(self):
+        for conn in [self.writer, *self.readers]:
+            await conn.close()
+    
+    async def drain_and_close(self):
+        async with self.writer_lock:
+            for _ in self.readers:
+                await self.idle_readers.get()
+            await self.close()
+
+
+_pool: Optional[DatabasePool] = None
+_pool_version = 0
+_draining_pools: Set[asyncio.Task] = set()
+
+
+async def _open_pool(options: Tuple[int, Tuple[str, ...]]) -> DatabasePool:
+    readers_count = options[0]
+    writer = await _open_connection()
+    readers = [await _open_connection(read_only=True) for _ in range(readers_count)]
+    logger.info(f"Пул соединений SQLite открыт: 1 писатель, {readers_count} читателей")
+    return DatabasePool(writer, readers, options)
+
+
+async def init_pool():
+    global _pool, _pool_version
+    if _pool is not None:
+        return
+    _pool_version = get_settings_version()
+    _pool = await _open_pool(_get_pool_options())
+
+
+async def _current_pool() -> Optional[DatabasePool]:
+    global _pool, _pool_version
+    pool = _pool
+    if pool is None or _pool_version == get_settings_version():
+        return pool
+    
+    _pool_version = get_settings_version()
+    options = _get_pool_options()
+    if options == pool.options:
+        return pool
+    
+    new_pool = await _open_pool(options)
+    if _pool is not pool:
+        await new_pool.close()
+        return _pool
+    _pool = new_pool
+    logger.info("Настройки SQLite изменились, пул соединений пересоздан")
+    task = asyncio.ensure_future(pool.drain_and_close())
+    _draining_pools.add(task)
+    task.add_done_callback(_draining_pools.discard)
+    return new_pool
+
+
+async def close_pool():
+    global _pool
+    pool = _pool
+    _pool = None
+    if pool is not None:
+        async with pool.writer_lock:
+            await pool.close()
+    if _draining_pools:
+        await asyncio.gather(*_draining_pools, return_exceptions=True)
+
+
+@asynccontextmanager
+async def writer_connection() -> AsyncIterator[aiosqlite.Connection]:
+    pool = await _current_pool()
+    if pool is None:
+        conn = await _open_connection()
+        try:
+            yield conn
+            if conn.in_transaction:
+                await conn.commit()
+        except BaseException:
+            await conn.rollback()
+            raise
+        finally:
+            await conn.close()
+        return
+    
+    async with pool.writer_lock:
+        try:
+            yield pool.writer
+            if pool.writer.in_transaction:
+                await pool.writer.commit()
+        except BaseException:
+            await pool.writer.rollback()
+            raise
+
+
+@asynccontextmanager
+async def reader_connection() -> AsyncIterator[aiosqlite.Connection]:
+    pool = await _current_pool()
+    if pool is None:
+        conn = await _open_connection(read_only=True)
+        try:
+            yield conn
+        finally:
+            await conn.close()
+        return
+    
+    conn = await pool.idle_readers.get()
+    try:
+        yield conn
+    finally:
+        pool.idle_readers.put_nowait(conn)
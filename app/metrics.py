@@ -0,0 +1,244 @@
+import time
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+from app.config import get_config_value
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def is_metrics_enabled() -> bool:
+    return bool(get_config_value("metrics.enabled", True))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+    
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+    
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in self._values.items()
+        ]
+    
+    def clear(self):
+        self._values.clear()
+
+
+class Gauge:
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def set(self, value: float, *labels: str):
+        self._values[labels] = float(value)
+    
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+    
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in self._values.items()
+        ]
+    
+    def clear(self):
+        self._values.clear()
+
+
+class Histogram:
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+    
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = [0.0] * (len(self.buckets) + 2)
+            self._series[labels] = series
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+    
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+    
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, series in self._series.items():
+            cumulative = 0.0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {_format_value(cumulative)}")
+        return lines
+    
+    def clear(self):
+        self._series.clear()
+
+
+class Timer:
+    __slots__ = ("histogram", "errors", "labels", "started_at", "failed")
+    
+    def __init__(self, histogram: Histogram, errors: Counter, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.errors = errors
+        self.labels = labels
+        self.failed = False
+    
+    def check(self, status_code: int):
+        if status_code >= 400:
+            self.failed = True
+    
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.started_at, *self.labels)
+        if exc_type is not None or self.failed:
+            self.errors.inc(*self.labels)
+        return False
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса", ("method", "route", "status")
+)
+upstream_request_duration = Histogram(
+    "upstream_request_duration_seconds", "Время запроса к внешнему API", ("upstream", "operation")
+)
+upstream_errors = Counter(
+    "upstream_errors_total", "Ошибки запросов к внешним API", ("upstream", "operation")
+)
+sqlite_query_duration = Histogram(
+    "sqlite_query_duration_seconds", "Время выполнения запросов к SQLite", ("operation",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+sqlite_errors = Counter("sqlite_errors_total", "Ошибки запросов к SQLite", ("operation",))
+ingestion_cycle_duration = Histogram(
+    "ingestion_cycle_duration_seconds", "Длительность цикла обновления рейсов", (),
+    buckets=(1.0, 5.0, 10.0, 30.0, 60.0, 90.0, 120.0, 180.0, 300.0, 600.0)
+)
+ingestion_rows = Counter("ingestion_rows_total", "Рейсы, обработанные циклом обновления", ("result",))
+ingestion_last_cycle_timestamp = Gauge(
+    "ingestion_last_cycle_timestamp_seconds", "Время начала последнего цикла обновления рейсов по данным базы"
+)
+ingestion_last_cycle_duration = Gauge(
+    "ingestion_last_cycle_duration_seconds", "Длительность последнего цикла обновления рейсов по данным базы"
+)
+ingestion_last_cycle_rows = Gauge(
+    "ingestion_last_cycle_rows", "Рейсы, обработанные последним циклом обновления, по данным базы", ("result",)
+)
+geocoding_cache_lookups = Counter(
+    "geocoding_cache_lookups_total", "Обращения к кэшу геокодирования", ("provider", "result")
+)
+llm_limiter_queue_depth = Gauge(
+    "llm_limiter_queue_depth", "Запросы к OpenRouter, ожидающие в очереди лимитера", ("model",)
+)
+llm_limiter_wait_duration = Histogram(
+    "llm_limiter_wait_seconds", "Время ожидания запроса к OpenRouter в очереди лимитера", ("model",),
+    buckets=(0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+REGISTRY = (
+    http_request_duration,
+    upstream_request_duration,
+    upstream_errors,
+    sqlite_query_duration,
+    sqlite_errors,
+    ingestion_cycle_duration,
+    ingestion_rows,
+    ingestion_last_cycle_timestamp,
+    ingestion_last_cycle_duration,
+    ingestion_last_cycle_rows,
+    geocoding_cache_lookups,
+    llm_limiter_queue_depth,
+    llm_limiter_wait_duration,
+)
+
+
+def track_upstream(upstream: str, operation: str) -> Timer:
+    return Timer(upstream_request_duration, upstream_errors, (upstream, operation))
+
+
+def track_sqlite(operation: str) -> Timer:
+    return Timer(sqlite_query_duration, sqlite_errors, (operation,))
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    for metric in REGISTRY:
+        metric.clear()
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not is_metrics_enabled():
+            await self.app(scope, receive, send)
+            return
+        
+        started_at = time.perf_counter()
+        status = "500"
+        
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            http_request_duration.observe(time.perf_counter() - started_at, scope["method"], path, status)
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from pydantic import BaseModel
 
@@ -18,5 +18,26 @@ class Flight(BaseModel):
 
 class FlightListResponse(BaseModel):
     flights: List[Flight]
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
 
+
+class IngestionCycle(BaseModel):
+    started_at: datetime
+    duration_seconds: float
+    overrun: bool
+    stages: Dict[str, float]
+    feed_size: int = 0
+    details_requested: int = 0
+    details_latency_ms: Dict[str, float] = {}
+    commits: int = 0
+    saved: int = 0
+    skipped: Dict[str, int] = {}
+    error: Optional[str] = None
+
+
+class IngestionStatsResponse(BaseModel):
+    interval_seconds: float
+    budget_seconds: float
+    overruns: int
+    cycles: List[IngestionCycle]
@@ -0,0 +1,73 @@
+import math
+from functools import lru_cache
+from typing import Any, get_args
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from app.config import get_config_value
+
+
+_SCALAR_TYPES = frozenset({str, int, bool, float, type(None)})
+
+
+def is_fast_json_enabled() -> bool:
+    return bool(get_config_value("api.fast_json", True))
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _may_hold_floats(annotation: Any) -> bool:
+    if annotation in (float, Any, object, dict, list, tuple, set):
+        return True
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return bool(_float_fields(annotation)) or annotation.model_config.get("extra") == "allow"
+    return any(_may_hold_floats(arg) for arg in get_args(annotation))
+
+
+@lru_cache(maxsize=None)
+def _float_fields(model_cls: type) -> tuple:
+    return tuple(name for name, field in model_cls.model_fields.items() if _may_hold_floats(field.annotation))
+
+
+def _has_non_finite(value: Any) -> bool:
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, BaseModel):
+        if any(_has_non_finite(getattr(value, name)) for name in _float_fields(type(value))):
+            return True
+        return bool(value.__pydantic_extra__) and _has_non_finite(value.__pydantic_extra__)
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, (list, tuple)):
+        return False
+    kinds = set(map(type, value))
+    if float in kinds and not all(math.isfinite(item) for item in value if type(item) is float):
+        return True
+    if kinds <= _SCALAR_TYPES:
+        return False
+    return any(_has_non_finite(item) for item in value if type(item) not in _SCALAR_TYPES)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            if _has_non_finite(content):
+                raise ValueError("Out of range float values are not JSON compliant")
+            return content.model_dump_json().encode("utf-8")
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        rendered = orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+        if b"null" in rendered and _has_non_finite(content):
+            raise ValueError("Out of range float values are not JSON compliant")
+        return rendered
+
+
+def json_response(content: Any, **kwargs) -> JSONResponse:
+    if is_fast_json_enabled():
+        return FastJSONResponse(content, **kwargs)
+    return JSONResponse(jsonable_encoder(content), **kwargs)
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Query, BackgroundTasks
+from fastapi import APIRouter, Query, BackgroundTasks, HTTPException
 from typing import Optional
-from datetime import datetime
-from app.models.flights import Flight, FlightListResponse
-from app.services.aviaradar import update_flights_data, get_flights_from_db
+from app.models.flights import FlightListResponse, IngestionStatsResponse
+from app.responses import json_response
+from app.services.aviaradar import update_flights_data, list_flights, get_ingestion_cycle_stats
 
 router = APIRouter(prefix="/flights", tags=["flights"])
 
@@ -10,11 +10,15 @@ router = APIRouter(prefix="/flights", tags=["flights"])
 @router.get("", response_model=FlightListResponse)
 async def get_flights(
     flight_number: Optional[str] = Query(None, description="Фильтр по номеру рейса"),
-    has_delay: Optional[bool] = Query(None, description="Фильтр по наличию задержки")
+    has_delay: Optional[bool] = Query(None, description="Фильтр по наличию задержки"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Максимальное количество рейсов на странице"),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"),
+    include_total: bool = Query(True, description="Считать общее количество рейсов")
 ):
-    flights = await get_flights_from_db("flight", flight_number, has_delay)
-    flights = sorted(flights, key=lambda x: x.scheduled_time if x.scheduled_time else datetime.min)
-    return FlightListResponse(flights=flights, total=len(flights))
+    try:
+        return json_response(await list_flights("flight", flight_number, has_delay, limit, cursor, include_total))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/update")
@@ -23,31 +27,48 @@ async def manual_update(background_tasks: BackgroundTasks):
     return {"message": "Обновление запущено"}
 
 
+@router.get("/ingestion/stats", response_model=IngestionStatsResponse)
+async def ingestion_stats():
+    return json_response(await get_ingestion_cycle_stats())
+
+
 @router.get("/all", response_model=FlightListResponse)
 async def get_all_flights(
     flight_number: Optional[str] = Query(None, description="Фильтр по номеру рейса"),
-    has_delay: Optional[bool] = Query(None, description="Фильтр по наличию задержки")
+    has_delay: Optional[bool] = Query(None, description="Фильтр по наличию задержки"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Максимальное количество рейсов на странице"),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"),
+    include_total: bool = Query(True, description="Считать общее количество рейсов")
 ):
-    flights = await get_flights_from_db("flight", flight_number, has_delay)
-    flights = sorted(flights, key=lambda x: x.scheduled_time if x.scheduled_time else datetime.min)
-    return FlightListResponse(flights=flights, total=len(flights))
+    try:
+        return json_response(await list_flights("flight", flight_number, has_delay, limit, cursor, include_total))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/departures", response_model=FlightListResponse)
 async def get_departures(
     flight_number: Optional[str] = Query(None, description="Фильтр по номеру рейса"),
-    has_delay: Optional[bool] = Query(None, description="Фильтр по наличию задержки")
+    has_delay: Optional[bool] = Query(None, description="Фильтр по наличию задержки"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Максимальное количество рейсов на странице"),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"),
+    include_total: bool = Query(True, description="Считать общее количество рейсов")
 ):
-    flights = await get_flights_from_db("flight", flight_number, has_delay)
-    flights = sorted(flights, key=lambda x: x.scheduled_time if x.scheduled_time else datetime.min)
-    return FlightListResponse(flights=flights, total=len(flights))
+    try:
+        return json_response(await list_flights("flight", flight_number, has_delay, limit, cursor, include_total))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/arrivals", response_model=FlightListResponse)
 async def get_arrivals(
     flight_number: Optional[str] = Query(None, description="Фильтр по номеру рейса"),
-    has_delay: Optional[bool] = Query(None, description="Фильтр по наличию задержки")
+    has_delay: Optional[bool] = Query(None, description="Фильтр по наличию задержки"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Максимальное количество рейсов на странице"),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"),
+    include_total: bool = Query(True, description="Считать общее количество рейсов")
 ):
-    flights = await get_flights_from_db("flight", flight_number, has_delay)
-    flights = sorted(flights, key=lambda x: x.scheduled_time if x.scheduled_time else datetime.min)
-    return FlightListResponse(flights=flights, total=len(flights))
+    try:
+        return json_response(await list_flights("flight", flight_number, has_delay, limit, cursor, include_total))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,18 @@
+import logging
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.metrics import render_metrics, CONTENT_TYPE
+from app.services.ingestion_trace import refresh_ingestion_metrics
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    try:
+        await refresh_ingestion_metrics()
+    except Exception as e:
+        logger.warning(f"Не удалось прочитать последний цикл обновления рейсов: {e}")
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
@@ -1,8 +1,17 @@
-from fastapi import APIRouter, Request, HTTPException, Header
+from fastapi import APIRouter, Request, HTTPException, Header, Response
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any, Optional
 import logging
-from app.services.openrouter import proxy_request
-from app.config import get_config_value
+from app.services.openrouter import (
+    proxy_request,
+    stream_request,
+    passthrough_request,
+    create_chat_completion,
+    list_models,
+    limiter_stats,
+    UpstreamRateLimitError
+)
+from app.config import get_config_value, get_settings
 from app.models.openrouter import (
     ChatCompletionRequest,
     ChatCompletionResponse,
@@ -15,7 +24,29 @@ router = APIRouter(prefix="/openrouter", tags=["openrouter"])
 
 
 def _get_api_token() -> str:
-    return get_config_value("openrouter.api_token", "")
+    return get_settings().openrouter.api_token
+
+
+def _is_passthrough_validation_enabled() -> bool:
+    return bool(get_config_value("openrouter.validate_passthrough", False))
+
+
+def _is_no_cache(cache_control: Optional[str]) -> bool:
+    return bool(cache_control) and "no-cache" in cache_control.lower()
+
+
+def _set_cache_headers(response: Response, cache_status: str, age: float):
+    response.headers["X-Cache"] = cache_status
+    response.headers["Age"] = str(int(age))
+
+
+def _passthrough_response(upstream) -> StreamingResponse:
+    headers = {"Retry-After": upstream.retry_after} if upstream.retry_after else None
+    return StreamingResponse(upstream.iter_bytes(), status_code=upstream.status_code, media_type=upstream.media_type, headers=headers)
+
+
+def _rate_limited(e: UpstreamRateLimitError) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(max(1, round(e.retry_after)))})
 
 
 def _verify_token(x_api_token: Optional[str] = Header(None, alias="X-API-Token")) -> str:
@@ -36,13 +67,29 @@ def _verify_token(x_api_token: Optional[str] = Header(None, alias="X-API-Token")
     "/chat/completions",
     response_model=ChatCompletionResponse,
     summary="Chat Completions",
-    description="Создает completion для списка сообщений чата. Проксирует запрос в OpenRouter API. Требует заголовок X-API-Token."
+    description="Создает completion для списка сообщений чата. Проксирует запрос в OpenRouter API. При stream=true отдает SSE-чанки по мере поступления. Требует заголовок X-API-Token."
 )
-async def chat_completions(request: ChatCompletionRequest, token: str = Header(..., alias="X-API-Token", description="API токен для доступа")):
+async def chat_completions(
+    request: ChatCompletionRequest,
+    response: Response,
+    token: str = Header(..., alias="X-API-Token", description="API токен для доступа"),
+    cache_control: Optional[str] = Header(None, alias="Cache-Control", description="no-cache отключает кэш ответа")
+):
     _verify_token(token)
     try:
-        result = await proxy_request("POST", "chat/completions", data=request.model_dump(exclude_none=True))
-        return result
+        if request.stream:
+            upstream = await stream_request("chat/completions", request.model_dump(exclude_none=True))
+            return StreamingResponse(
+                upstream.iter_bytes(),
+                status_code=upstream.status_code,
+                media_type=upstream.media_type or "text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        result = await create_chat_completion(request.model_dump(exclude_none=True), bypass_cache=_is_no_cache(cache_control))
+        _set_cache_headers(response, result.cache_status, result.age)
+        return result.data
+    except UpstreamRateLimitError as e:
+        raise _rate_limited(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -56,11 +103,18 @@ async def chat_completions(request: ChatCompletionRequest, token: str = Header(.
     summary="List Models",
     description="Получает список доступных моделей. Проксирует запрос в OpenRouter API. Требует заголовок X-API-Token."
 )
-async def list_models(token: str = Header(..., alias="X-API-Token", description="API токен для доступа")):
+async def list_models_endpoint(
+    response: Response,
+    token: str = Header(..., alias="X-API-Token", description="API токен для доступа"),
+    cache_control: Optional[str] = Header(None, alias="Cache-Control", description="no-cache отключает кэш ответа")
+):
     _verify_token(token)
     try:
-        result = await proxy_request("GET", "models")
-        return result
+        result = await list_models(bypass_cache=_is_no_cache(cache_control))
+        _set_cache_headers(response, result.cache_status, result.age)
+        return result.data
+    except UpstreamRateLimitError as e:
+        raise _rate_limited(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -68,13 +122,35 @@ async def list_models(token: str = Header(..., alias="X-API-Token", description=
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get(
+    "/limiter/stats",
+    summary="Limiter Stats",
+    description="Состояние адаптивного лимитера запросов к OpenRouter по моделям: текущий лимит, запросы в работе, глубина очереди и время ожидания. Требует заголовок X-API-Token."
+)
+async def get_limiter_stats(token: str = Header(..., alias="X-API-Token", description="API токен для доступа")):
+    _verify_token(token)
+    return limiter_stats()
+
+
 @router.post("/{path:path}")
-async def proxy_any_post(path: str, request: Request, token: str = Header(..., alias="X-API-Token", description="API токен для доступа")):
+async def proxy_any_post(
+    path: str,
+    request: Request,
+    token: str = Header(..., alias="X-API-Token", description="API токен для доступа"),
+    model: Optional[str] = Header(None, alias="X-Model", description="Модель для лимитера запросов; тело запроса не разбирается")
+):
     _verify_token(token)
     try:
+        if not _is_passthrough_validation_enabled():
+            upstream = await passthrough_request(
+                "POST", path, body=await request.body(), content_type=request.headers.get("content-type", "application/json"), model=model
+            )
+            return _passthrough_response(upstream)
         body = await request.json()
         result = await proxy_request("POST", path, data=body)
         return result
+    except UpstreamRateLimitError as e:
+        raise _rate_limited(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -83,12 +159,21 @@ async def proxy_any_post(path: str, request: Request, token: str = Header(..., a
 
 
 @router.get("/{path:path}")
-async def proxy_any_get(path: str, request: Request, token: str = Header(..., alias="X-API-Token", description="API токен для доступа")):
+async def proxy_any_get(
+    path: str,
+    request: Request,
+    token: str = Header(..., alias="X-API-Token", description="API токен для доступа"),
+    model: Optional[str] = Header(None, alias="X-Model", description="Модель для лимитера запросов")
+):
     _verify_token(token)
     try:
         params = dict(request.query_params)
+        if not _is_passthrough_validation_enabled():
+            return _passthrough_response(await passthrough_request("GET", path, params=params, model=model))
         result = await proxy_request("GET", path, params=params)
         return result
+    except UpstreamRateLimitError as e:
+        raise _rate_limited(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Query, HTTPException
 from typing import Optional
 from app.models.twogis import HotelListResponse, RouteMapResponse
-from app.services.twogis import search_hotels, get_route_map
+from app.responses import json_response
+from app.services.twogis import get_cached_hotels, get_route_map
 
 router = APIRouter(prefix="/twogis", tags=["twogis"])
 
@@ -13,8 +14,11 @@ async def get_hotels(
     date_to: Optional[str] = Query(None, description="Дата выезда (формат: YYYY-MM-DD)")
 ):
     try:
-        hotels = await search_hotels(city, date_from, date_to)
-        return HotelListResponse(hotels=hotels, total=len(hotels))
+        result = await get_cached_hotels(city, date_from, date_to)
+        return json_response(
+            HotelListResponse(hotels=result.hotels, total=len(result.hotels)),
+            headers={"Age": str(int(result.age)), "X-Cache": result.cache_status}
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
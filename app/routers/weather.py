@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Query, HTTPException
 from app.models.weather import WeatherResponse
+from app.responses import json_response
 from app.services.openmeteo import get_weather_by_city_and_dates
 
 router = APIRouter(prefix="/weather", tags=["weather"])
@@ -12,7 +13,7 @@ async def get_weather(
     date_to: str = Query(..., description="Дата окончания (формат: YYYY-MM-DD)")
 ):
     try:
-        return await get_weather_by_city_and_dates(city, date_from, date_to)
+        return json_response(await get_weather_by_city_and_dates(city, date_from, date_to))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -1,6 +1,12 @@
-from fastapi import APIRouter, Query
-from typing import Optional
-from datetime import datetime, timedelta
+import json
+import re
+from fastapi import APIRouter, Query, Response
+from typing import Optional, Callable, Dict, List, Union
+from datetime import date, timedelta
+from app.cache import TTLCache
+from app.config import get_config_value
+from app.responses import json_response
+from app.services.travel_view import build_live_travel_view
 from app.models.widgets import (
     WidgetViewResponse, WidgetActionRequest, WidgetActionResponse,
     Widget, Item, Action, QuizQuestion, QuizOption
@@ -8,25 +14,98 @@ from app.models.widgets import (
 
 router = APIRouter(prefix="/widgets", tags=["widgets"])
 
+GOAL_ID_SENTINEL = "@@GOAL_ID@@"
+CONTEXT_SENTINEL = "@@CONTEXT@@"
+DATE_SENTINELS = ("@@DATE_0@@", "@@DATE_1@@", "@@DATE_2@@")
+
+_SENTINEL_PATTERN = re.compile(r'"@@GOAL_ID@@"|"@@CONTEXT@@"|@@DATE_(\d)@@')
+
+
+class ViewTemplate:
+    def __init__(self, view: WidgetViewResponse):
+        self._parts: List[Union[str, int]] = []
+        encoded = view.model_dump_json()
+        position = 0
+        for match in _SENTINEL_PATTERN.finditer(encoded):
+            self._parts.append(encoded[position:match.start()])
+            if match.group(1) is not None:
+                self._parts.append(int(match.group(1)))
+            else:
+                self._parts.append(match.group(0).strip('"'))
+            position = match.end()
+        self._parts.append(encoded[position:])
+    
+    def render(self, today: date, goal_id: Optional[str], context: str) -> bytes:
+        values = {
+            GOAL_ID_SENTINEL: json.dumps(goal_id, ensure_ascii=False),
+            CONTEXT_SENTINEL: json.dumps(context, ensure_ascii=False),
+        }
+        chunks = []
+        for part in self._parts:
+            if isinstance(part, int):
+                chunks.append((today + timedelta(days=part)).isoformat())
+            elif part in values:
+                chunks.append(values[part])
+            else:
+                chunks.append(part)
+        return "".join(chunks).encode("utf-8")
+
+
+_view_templates: Dict[str, ViewTemplate] = {}
+_rendered_views = TTLCache.from_settings(lambda: (int(get_config_value("widgets.view_cache_size", 1024)), 24 * 3600))
+
+
+def _get_view_template(name: str, build: Callable[[], WidgetViewResponse]) -> ViewTemplate:
+    template = _view_templates.get(name)
+    if template is None:
+        template = ViewTemplate(build())
+        _view_templates[name] = template
+    return template
+
+
+def render_widgets_view(goal_id: Optional[str], context: Optional[str]) -> bytes:
+    if context == "travel":
+        name, build = "travel", _get_travel_view
+    elif context == "savings":
+        name, build = "savings", _get_savings_view
+    else:
+        name, build = "default", _get_default_view
+    context = context or "default"
+    
+    today = date.today()
+    key = (context, today, goal_id)
+    entry = _rendered_views.get_entry(key)
+    if entry is not None:
+        return entry.value
+    
+    body = _get_view_template(name, build).render(today, goal_id, context)
+    _rendered_views.set(key, body)
+    return body
+
+
+def _is_live_travel_default() -> bool:
+    return bool(get_config_value("widgets.travel_live", False))
+
+
+def clear_widgets_cache():
+    _view_templates.clear()
+    _rendered_views.clear()
+
 
 @router.get("/view", response_model=WidgetViewResponse)
 async def get_widgets_view(
     goal_id: Optional[str] = Query(None, description="Идентификатор цели"),
-    context: Optional[str] = Query(None, description="Контекст использования")
+    context: Optional[str] = Query(None, description="Контекст использования"),
+    live: Optional[bool] = Query(None, description="Заполнить витрину путешествия данными сервисов (только для context=travel)"),
+    city: Optional[str] = Query(None, description="Город для живой витрины путешествия")
 ):
-    if context == "travel":
-        return _get_travel_view(goal_id, context)
-    elif context == "savings":
-        return _get_savings_view(goal_id, context)
-    else:
-        return _get_default_view(goal_id, context or "default")
+    if context == "travel" and (live if live is not None else _is_live_travel_default()):
+        return json_response(await build_live_travel_view(goal_id, city))
+    return Response(content=render_widgets_view(goal_id, context), media_type="application/json")
 
 
-def _get_travel_view(goal_id: Optional[str], context: str) -> WidgetViewResponse:
-    today = datetime.now()
-    date_1 = today.strftime("%Y-%m-%d")
-    date_2 = (today + timedelta(days=1)).strftime("%Y-%m-%d")
-    date_3 = (today + timedelta(days=2)).strftime("%Y-%m-%d")
+def _get_travel_view() -> WidgetViewResponse:
+    date_1, date_2, date_3 = DATE_SENTINELS
     
     datetime_1 = f"{date_1}T10:00:00"
     datetime_2 = f"{date_1}T11:00:00"
@@ -215,16 +294,15 @@ def _get_travel_view(goal_id: Optional[str], context: str) -> WidgetViewResponse
     return WidgetViewResponse(
         view_id="travel_view_123",
         title="Поездка в Питер",
-        goal_id=goal_id,
-        context=context,
+        goal_id=GOAL_ID_SENTINEL,
+        context=CONTEXT_SENTINEL,
         widgets=widgets
     )
 
 
-def _get_savings_view(goal_id: Optional[str], context: str) -> WidgetViewResponse:
-    today = datetime.now()
-    datetime_1 = f"{today.strftime('%Y-%m-%d')}T10:00:00"
-    datetime_2 = f"{today.strftime('%Y-%m-%d')}T11:00:00"
+def _get_savings_view() -> WidgetViewResponse:
+    datetime_1 = f"{DATE_SENTINELS[0]}T10:00:00"
+    datetime_2 = f"{DATE_SENTINELS[0]}T11:00:00"
 
     widgets = [
         Widget(
@@ -336,15 +414,14 @@ def _get_savings_view(goal_id: Optional[str], context: str) -> WidgetViewRespons
     return WidgetViewResponse(
         view_id="savings_view_123",
         title="Покупка китайской машины",
-        goal_id=goal_id,
-        context=context,
+        goal_id=GOAL_ID_SENTINEL,
+        context=CONTEXT_SENTINEL,
         widgets=widgets
     )
 
 
-def _get_default_view(goal_id: Optional[str], context: str) -> WidgetViewResponse:
-    today = datetime.now()
-    datetime_1 = f"{today.strftime('%Y-%m-%d')}T10:00:00"
+def _get_default_view() -> WidgetViewResponse:
+    datetime_1 = f"{DATE_SENTINELS[0]}T10:00:00"
 
     widgets = [
         Widget(
@@ -397,8 +474,8 @@ def _get_default_view(goal_id: Optional[str], context: str) -> WidgetViewRespons
     return WidgetViewResponse(
         view_id="default_view_123",
         title="Обучение ИИ",
-        goal_id=goal_id,
-        context=context,
+        goal_id=GOAL_ID_SENTINEL,
+        context=CONTEXT_SENTINEL,
         widgets=widgets
     )
 
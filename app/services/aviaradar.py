@@ -1,10 +1,20 @@
-from typing import Optional, List
+from typing import Optional, List, Sequence, Tuple, Dict
 from datetime import datetime, timezone, timedelta
-import httpx
+import asyncio
+import base64
+import hashlib
+from itertools import islice
+import json
+import time
 import aiosqlite
 import logging
-from app.db import get_db_connection
-from app.models.flights import Flight
+from app.clients import http_client
+from app.config import get_config_value
+from app.db import reader_connection, writer_connection, bump_data_version
+from app.metrics import track_upstream, track_sqlite, ingestion_cycle_duration, ingestion_rows
+from app.models.flights import Flight, FlightListResponse, IngestionStatsResponse
+from app.services.flights_snapshot import rebuild_flights_snapshot, get_flights_snapshot, is_snapshot_enabled, FLIGHTS_DATA_VERSION
+from app.services.ingestion_trace import CycleTrace, get_ingestion_stats, save_cycle
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +31,26 @@ HEADERS = {
 }
 
 
+def _get_details_concurrency() -> int:
+    return max(1, int(get_config_value("aviaradar.details_concurrency", 20)))
+
+
+def get_update_interval_seconds() -> float:
+    return float(get_config_value("ingestion.interval_seconds", 120))
+
+
+def _get_cycle_budget_seconds() -> float:
+    return float(get_config_value("aviaradar.cycle_budget_seconds", 100))
+
+
+def _get_write_batch_size() -> int:
+    return max(1, int(get_config_value("aviaradar.write_batch_size", 500)))
+
+
+def _is_delta_ingestion_enabled() -> bool:
+    return bool(get_config_value("aviaradar.delta_ingestion", True))
+
+
 def parse_datetime(dt_str: Optional[str]) -> Optional[datetime]:
     if not dt_str:
         return None
@@ -39,29 +69,74 @@ def calculate_delay(scheduled: Optional[datetime], actual: Optional[datetime]) -
 
 async def fetch_aircrafts_feed() -> List[dict]:
     url = f"{AVIARADAR_API_BASE}/api/aircrafts/feed"
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(url, headers=HEADERS)
-        response.raise_for_status()
-        return response.json()
+    with track_upstream("aviaradar", "feed"):
+        async with http_client("aviaradar") as client:
+            response = await client.get(url, headers=HEADERS)
+            response.raise_for_status()
+            return response.json()
 
 
 async def fetch_flight_details(flight_id: str) -> Optional[dict]:
     url = f"{AVIARADAR_API_BASE}/api/flights/{flight_id}"
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.get(url, headers=HEADERS)
-        if response.status_code == 404:
-            return None
-        response.raise_for_status()
-        return response.json()
+    with track_upstream("aviaradar", "details"):
+        async with http_client("aviaradar") as client:
+            response = await client.get(url, headers=HEADERS)
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            return response.json()
 
 
-async def save_flight_to_db(conn: aiosqlite.Connection, flight_data: dict, flight_type: str):
+def feed_fingerprint(aircraft: dict) -> str:
+    payload = json.dumps(aircraft, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+async def load_feed_fingerprints(conn: aiosqlite.Connection) -> Dict[str, Tuple[str, bool]]:
+    cursor = await conn.execute("SELECT flight_id, fingerprint, live FROM flight_fingerprints")
+    rows = await cursor.fetchall()
+    return {flight_id: (fingerprint, bool(live)) for flight_id, fingerprint, live in rows}
+
+
+async def save_feed_fingerprints(conn: aiosqlite.Connection, fingerprints: List[Tuple[str, str, bool]]):
+    updated_at = datetime.now(timezone.utc).isoformat()
+    await conn.executemany("""
+        INSERT INTO flight_fingerprints (flight_id, fingerprint, live, updated_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(flight_id) DO UPDATE SET
+            fingerprint = excluded.fingerprint,
+            live = excluded.live,
+            updated_at = excluded.updated_at
+    """, [(flight_id, fingerprint, int(live), updated_at) for flight_id, fingerprint, live in fingerprints])
+
+
+UPSERT_FLIGHT_SQL = """
+    INSERT INTO flights
+    (flight_id, flight_number, destination, origin, scheduled_time, actual_time,
+     status, gate, terminal, delay_minutes, flight_type, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(flight_id) DO UPDATE SET
+        flight_number = excluded.flight_number,
+        destination = excluded.destination,
+        origin = excluded.origin,
+        scheduled_time = excluded.scheduled_time,
+        actual_time = excluded.actual_time,
+        status = excluded.status,
+        gate = excluded.gate,
+        terminal = excluded.terminal,
+        delay_minutes = excluded.delay_minutes,
+        flight_type = excluded.flight_type,
+        updated_at = excluded.updated_at
+"""
+
+
+def parse_flight_row(flight_data: dict, flight_type: str) -> Optional[tuple]:
     flight_id = flight_data.get("id", "")
     flight_number = flight_data.get("number", "") or flight_data.get("callsign", "")
     
     if not flight_id or not flight_number:
         logger.warning(f"Пропуск рейса: нет flight_id или flight_number. flight_id={flight_id}, flight_number={flight_number}")
-        return
+        return None
     
     destination_airport = flight_data.get("destination_airport", {})
     origin_airport = flight_data.get("origin_airport", {})
@@ -78,155 +153,397 @@ async def save_flight_to_db(conn: aiosqlite.Connection, flight_data: dict, fligh
     delay_minutes = calculate_delay(scheduled_time, actual_time)
     updated_at = datetime.now(timezone.utc).isoformat()
     
-    cursor = await conn.execute("""
-        INSERT OR REPLACE INTO flights 
-        (flight_id, flight_number, destination, origin, scheduled_time, actual_time,
-         status, gate, terminal, delay_minutes, flight_type, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
+    return (
         flight_id, flight_number, destination, origin,
         scheduled_time.isoformat() if scheduled_time else None,
         actual_time.isoformat() if actual_time else None,
         status, None, None, delay_minutes, flight_type, updated_at
-    ))
+    )
+
+
+async def save_flight_to_db(conn: aiosqlite.Connection, flight_data: dict, flight_type: str):
+    row = parse_flight_row(flight_data, flight_type)
+    if row is None:
+        return
+    
+    cursor = await conn.execute(UPSERT_FLIGHT_SQL, row)
     
     if cursor.rowcount == 0:
-        logger.warning(f"Не удалось сохранить рейс {flight_number} (flight_id={flight_id})")
+        logger.warning(f"Не удалось сохранить рейс {row[1]} (flight_id={row[0]})")
+
+
+async def save_flights_batch(conn: aiosqlite.Connection, rows: List[tuple], batch_size: int) -> int:
+    commits = 0
+    for start in range(0, len(rows), batch_size):
+        await conn.executemany(UPSERT_FLIGHT_SQL, rows[start:start + batch_size])
+        await conn.commit()
+        commits += 1
+    return commits
+
+
+async def fetch_flights_details_concurrently(
+    flight_ids: List[str],
+    concurrency: int,
+    budget_seconds: float,
+    latencies: Optional[List[float]] = None
+) -> Tuple[List[Tuple[str, Optional[dict]]], int, int]:
+    results: List[Tuple[str, Optional[dict]]] = []
+    errors = 0
+    pending_ids = iter(flight_ids)
+
+    async def worker():
+        nonlocal errors
+        for flight_id in pending_ids:
+            started_at = time.perf_counter()
+            try:
+                details = await fetch_flight_details(flight_id)
+            except Exception as e:
+                errors += 1
+                logger.debug(f"Не удалось получить детали рейса {flight_id}: {e}")
+                continue
+            finally:
+                if latencies is not None:
+                    latencies.append(time.perf_counter() - started_at)
+            results.append((flight_id, details))
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, len(flight_ids)))]
+    if workers:
+        try:
+            await asyncio.wait_for(asyncio.gather(*workers), timeout=budget_seconds)
+        except asyncio.TimeoutError:
+            logger.warning(f"Превышен бюджет времени цикла ({budget_seconds} с), получено деталей: {len(results)} из {len(flight_ids)}")
+
+    not_fetched = len(flight_ids) - len(results) - errors
+    return results, errors, not_fetched
 
 
 async def update_flights_data():
-    conn = None
+    trace = CycleTrace()
     try:
-        conn = await get_db_connection()
-        aircrafts = await fetch_aircrafts_feed()
+        started_at = time.monotonic()
+        with trace.stage("feed"):
+            aircrafts = await fetch_aircrafts_feed()
+        trace.feed_size = len(aircrafts)
         logger.info(f"Получено {len(aircrafts)} самолетов из API")
         
-        saved_count = 0
         skipped_count = 0
         skipped_no_flight_id = 0
         skipped_no_details = 0
         skipped_no_airports = 0
+        skipped_unparsed = 0
+        skipped_unchanged = 0
         
-        for aircraft in aircrafts:
-            flight_id = aircraft.get("flight_id")
-            if not flight_id:
-                skipped_no_flight_id += 1
-                skipped_count += 1
-                continue
-            
-            flight_details = await fetch_flight_details(flight_id)
-            if not flight_details:
-                skipped_no_details += 1
-                skipped_count += 1
-                continue
-            
-            destination = flight_details.get("destination_airport", {}).get("iata")
-            origin = flight_details.get("origin_airport", {}).get("iata")
-            
-            if not destination and not origin:
-                skipped_no_airports += 1
-                skipped_count += 1
-                continue
-            
-            flight_number = flight_details.get("number") or flight_details.get("callsign", "")
-            await save_flight_to_db(conn, flight_details, "flight")
-            saved_count += 1
-            if saved_count <= 3:
-                logger.info(f"Сохранен рейс: {flight_number}, origin={origin}, destination={destination}")
-            
-            if saved_count % 10 == 0:
-                await conn.commit()
-                logger.debug(f"Промежуточный коммит: сохранено {saved_count} рейсов")
+        delta_enabled = _is_delta_ingestion_enabled()
+        known_fingerprints = {}
+        if delta_enabled:
+            with trace.stage("fingerprints"), track_sqlite("load_fingerprints"):
+                async with reader_connection() as conn:
+                    known_fingerprints = await load_feed_fingerprints(conn)
         
-        await conn.commit()
-        logger.info(f"Коммит транзакции выполнен. Обработано рейсов: сохранено {saved_count}, пропущено {skipped_count} (нет flight_id: {skipped_no_flight_id}, нет деталей: {skipped_no_details}, нет аэропортов: {skipped_no_airports})")
+        flight_ids = []
+        cycle_fingerprints: Dict[str, str] = {}
+        with trace.stage("parse"):
+            for aircraft in aircrafts:
+                flight_id = aircraft.get("flight_id")
+                if not flight_id:
+                    skipped_no_flight_id += 1
+                    skipped_count += 1
+                    continue
+                if flight_id in cycle_fingerprints:
+                    continue
+                fingerprint = feed_fingerprint(aircraft)
+                cycle_fingerprints[flight_id] = fingerprint
+                known = known_fingerprints.get(flight_id)
+                if known and known[0] == fingerprint and not known[1]:
+                    skipped_unchanged += 1
+                    continue
+                flight_ids.append(flight_id)
+        trace.details_requested = len(flight_ids)
+        
+        budget_seconds = max(0.0, _get_cycle_budget_seconds() - (time.monotonic() - started_at))
+        with trace.stage("details"):
+            details_list, skipped_errors, skipped_budget = await fetch_flights_details_concurrently(
+                flight_ids, _get_details_concurrency(), budget_seconds, trace.details_latencies
+            )
+        skipped_count += skipped_errors + skipped_budget
+        
+        rows: List[tuple] = []
+        fetched_fingerprints: List[Tuple[str, str, bool]] = []
+        with trace.stage("parse"):
+            for flight_id, flight_details in details_list:
+                if not flight_details:
+                    skipped_no_details += 1
+                    skipped_count += 1
+                    continue
+                
+                live = bool(flight_details.get("status", {}).get("live"))
+                fetched_fingerprints.append((flight_id, cycle_fingerprints[flight_id], live))
+                
+                destination = flight_details.get("destination_airport", {}).get("iata")
+                origin = flight_details.get("origin_airport", {}).get("iata")
+                
+                if not destination and not origin:
+                    skipped_no_airports += 1
+                    skipped_count += 1
+                    continue
+                
+                row = parse_flight_row(flight_details, "flight")
+                if row is None:
+                    skipped_unparsed += 1
+                    skipped_count += 1
+                    continue
+                rows.append(row)
+        
+        with trace.stage("write"), track_sqlite("upsert_flights"):
+            async with writer_connection() as conn:
+                commits = await save_flights_batch(conn, rows, _get_write_batch_size())
+                if delta_enabled and fetched_fingerprints:
+                    await save_feed_fingerprints(conn, fetched_fingerprints)
+                if rows:
+                    await bump_data_version(conn, FLIGHTS_DATA_VERSION)
+                if conn.in_transaction:
+                    await conn.commit()
+                    commits += 1
+        saved_count = len(rows)
+        for row in rows[:3]:
+            logger.info(f"Сохранен рейс: {row[1]}, origin={row[3]}, destination={row[2]}")
+        
+        elapsed = time.monotonic() - started_at
+        ingestion_cycle_duration.observe(elapsed)
+        skipped = {
+            "unchanged": skipped_unchanged,
+            "no_flight_id": skipped_no_flight_id,
+            "no_details": skipped_no_details,
+            "no_airports": skipped_no_airports,
+            "unparsed": skipped_unparsed,
+            "error": skipped_errors,
+            "budget": skipped_budget,
+        }
+        ingestion_rows.inc("saved", amount=saved_count)
+        for result, count in skipped.items():
+            ingestion_rows.inc(result, amount=count)
+        trace.commits = commits
+        trace.saved = saved_count
+        trace.skipped = skipped
+        logger.info(f"Запись выполнена за {commits} транзакций, цикл занял {elapsed:.1f} с. Обработано рейсов: сохранено {saved_count}, пропущено {skipped_count} (нет flight_id: {skipped_no_flight_id}, нет деталей: {skipped_no_details}, нет аэропортов: {skipped_no_airports}, не разобрано: {skipped_unparsed}, ошибок запроса: {skipped_errors}, не успели по бюджету: {skipped_budget})")
+        if delta_enabled:
+            logger.info(f"Без изменений в ленте: {skipped_unchanged}, сэкономлено запросов деталей: {skipped_unchanged} из {skipped_unchanged + len(flight_ids)}")
+        
+        if is_snapshot_enabled():
+            with trace.stage("snapshot"):
+                await rebuild_flights_snapshot()
     except Exception as e:
+        trace.error = str(e) or type(e).__name__
         logger.error(f"Ошибка при обновлении данных о рейсах: {e}", exc_info=True)
-        if conn:
-            await conn.rollback()
     finally:
-        if conn:
-            await conn.close()
+        interval_seconds = get_update_interval_seconds()
+        cycle = trace.finish(interval_seconds)
+        await save_cycle(cycle)
+        if cycle.overrun:
+            logger.warning(f"Цикл обновления рейсов занял {cycle.duration_seconds:.1f} с, больше интервала {interval_seconds} с. Этапы: {cycle.stages}")
+
+
+async def get_ingestion_cycle_stats() -> IngestionStatsResponse:
+    return await get_ingestion_stats(_get_cycle_budget_seconds(), get_update_interval_seconds())
 
 
 async def delete_old_flights():
-    conn = None
     try:
-        conn = await get_db_connection()
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=7)
         cutoff_str = cutoff_date.isoformat()
         
-        cursor = await conn.execute(
-            "DELETE FROM flights WHERE updated_at < ?",
-            (cutoff_str,)
-        )
-        deleted_count = cursor.rowcount
-        await conn.commit()
+        with track_sqlite("delete_old_flights"):
+            async with writer_connection() as conn:
+                cursor = await conn.execute(
+                    "DELETE FROM flights WHERE updated_at < ?",
+                    (cutoff_str,)
+                )
+                deleted_count = cursor.rowcount
+                await conn.execute(
+                    "DELETE FROM flight_fingerprints WHERE updated_at < ?",
+                    (cutoff_str,)
+                )
+                if deleted_count > 0:
+                    await bump_data_version(conn, FLIGHTS_DATA_VERSION)
+                await conn.commit()
         
         if deleted_count > 0:
             logger.info(f"Удалено старых рейсов: {deleted_count}")
+            if is_snapshot_enabled():
+                await rebuild_flights_snapshot()
         else:
             logger.debug("Старых рейсов для удаления не найдено")
         
         return deleted_count
     except Exception as e:
         logger.error(f"Ошибка при удалении старых рейсов: {e}", exc_info=True)
-        if conn:
-            await conn.rollback()
         raise
-    finally:
-        if conn:
-            await conn.close()
+
+
+def _flights_filter(
+    flight_type: str,
+    flight_number: Optional[str] = None,
+    has_delay: Optional[bool] = None,
+    destinations: Optional[Sequence[str]] = None
+) -> Tuple[str, list]:
+    where = "flight_type = ?"
+    params: list = [flight_type]
+    
+    if flight_number:
+        where += " AND flight_number LIKE ?"
+        params.append(f"%{flight_number.upper()}%")
+    
+    if has_delay is True:
+        where += " AND delay_minutes > 0"
+    elif has_delay is False:
+        where += " AND (delay_minutes IS NULL OR delay_minutes <= 0)"
+    
+    if destinations:
+        where += f" AND destination IN ({', '.join('?' for _ in destinations)})"
+        params.extend(destinations)
+    
+    return where, params
+
+
+def build_flights_query(
+    flight_type: str,
+    flight_number: Optional[str] = None,
+    has_delay: Optional[bool] = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[str, str]] = None,
+    destinations: Optional[Sequence[str]] = None
+) -> Tuple[str, list]:
+    where, params = _flights_filter(flight_type, flight_number, has_delay, destinations)
+    
+    if after:
+        scheduled_after, flight_id_after = after
+        if scheduled_after:
+            where += " AND (scheduled_time, flight_id) > (?, ?)"
+            params.extend([scheduled_after, flight_id_after])
+        else:
+            where += " AND (scheduled_time IS NOT NULL OR flight_id > ?)"
+            params.append(flight_id_after)
+    
+    query = f"""
+        SELECT flight_id, flight_number, destination, origin, scheduled_time, actual_time,
+               status, gate, terminal, delay_minutes
+        FROM flights WHERE {where}
+        ORDER BY scheduled_time ASC, flight_id ASC
+    """
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    return query, params
+
+
+def encode_flights_cursor(flight: Flight) -> str:
+    scheduled = flight.scheduled_time.isoformat() if flight.scheduled_time else ""
+    payload = json.dumps([scheduled, flight.flight_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_flights_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        scheduled, flight_id = json.loads(payload)
+    except (ValueError, TypeError):
+        raise ValueError("Неверный курсор пагинации")
+    if not isinstance(scheduled, str) or not isinstance(flight_id, str):
+        raise ValueError("Неверный курсор пагинации")
+    return scheduled, flight_id
 
 
 async def get_flights_from_db(
     flight_type: str,
     flight_number: Optional[str] = None,
-    has_delay: Optional[bool] = None
+    has_delay: Optional[bool] = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[str, str]] = None,
+    destinations: Optional[Sequence[str]] = None
 ) -> List[Flight]:
-    conn = await get_db_connection()
+    query, params = build_flights_query(flight_type, flight_number, has_delay, limit, after, destinations)
+    with track_sqlite("select_flights"):
+        async with reader_connection() as conn:
+            cursor = await conn.execute(query, params)
+            rows = await cursor.fetchall()
     
-    try:
-        query = "SELECT * FROM flights WHERE flight_type = ?"
-        params = [flight_type]
+    flights = []
+    for row in rows:
+        flight_id, flight_number_db, destination, origin, scheduled_str, actual_str, \
+        status, gate, terminal, delay_minutes = row
         
-        if flight_number:
-            query += " AND flight_number LIKE ?"
-            params.append(f"%{flight_number.upper()}%")
-        
-        query += " ORDER BY scheduled_time ASC"
-        
-        cursor = await conn.execute(query, params)
-        rows = await cursor.fetchall()
-        
-        flights = []
-        for row in rows:
-            flight_id, flight_number_db, destination, origin, scheduled_str, actual_str, \
-            status, gate, terminal, delay_minutes, _, updated_at = row
-            
-            scheduled_time = parse_datetime(scheduled_str) if scheduled_str else None
-            actual_time = parse_datetime(actual_str) if actual_str else None
-            
-            if has_delay is not None:
-                if has_delay and (not delay_minutes or delay_minutes <= 0):
-                    continue
-                if not has_delay and delay_minutes and delay_minutes > 0:
-                    continue
-            
-            flight = Flight(
-                flight_id=flight_id,
-                flight_number=flight_number_db,
-                destination=destination,
-                origin=origin,
-                scheduled_time=scheduled_time,
-                actual_time=actual_time,
-                status=status,
-                gate=gate,
-                terminal=terminal,
-                delay_minutes=delay_minutes
-            )
-            flights.append(flight)
-        
-        return flights
-    finally:
-        await conn.close()
+        flight = Flight(
+            flight_id=flight_id,
+            flight_number=flight_number_db,
+            destination=destination,
+            origin=origin,
+            scheduled_time=parse_datetime(scheduled_str),
+            actual_time=parse_datetime(actual_str),
+            status=status,
+            gate=gate,
+            terminal=terminal,
+            delay_minutes=delay_minutes
+        )
+        flights.append(flight)
+    
+    return flights
+
+
+async def count_flights_in_db(
+    flight_type: str,
+    flight_number: Optional[str] = None,
+    has_delay: Optional[bool] = None
+) -> int:
+    where, params = _flights_filter(flight_type, flight_number, has_delay)
+    with track_sqlite("count_flights"):
+        async with reader_connection() as conn:
+            cursor = await conn.execute(f"SELECT COUNT(*) FROM flights WHERE {where}", params)
+            row = await cursor.fetchone()
+    return row[0]
+
+
+async def list_flights(
+    flight_type: str,
+    flight_number: Optional[str] = None,
+    has_delay: Optional[bool] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = True
+) -> FlightListResponse:
+    after = decode_flights_cursor(cursor) if cursor else None
+    
+    if is_snapshot_enabled():
+        snapshot = await get_flights_snapshot()
+        flights, total, has_more = snapshot.page(flight_type, flight_number, has_delay, limit, after)
+    else:
+        flights = await get_flights_from_db(
+            flight_type, flight_number, has_delay, limit + 1 if limit is not None else None, after
+        )
+        has_more = limit is not None and len(flights) > limit
+        if has_more:
+            flights = flights[:limit]
+        if not include_total:
+            total = None
+        elif limit is None and after is None:
+            total = len(flights)
+        else:
+            total = await count_flights_in_db(flight_type, flight_number, has_delay)
+    
+    return FlightListResponse(
+        flights=flights,
+        total=total if include_total else None,
+        next_cursor=encode_flights_cursor(flights[-1]) if has_more else None
+    )
+
+
+async def list_flights_to(destinations: Sequence[str], limit: int) -> List[Flight]:
+    if not destinations:
+        return []
+    if not is_snapshot_enabled():
+        return await get_flights_from_db("flight", limit=limit, destinations=destinations)
+    
+    wanted = set(destinations)
+    snapshot = await get_flights_snapshot()
+    flights, _, _ = snapshot.page("flight")
+    matched = (flight for flight in flights if flight.destination in wanted)
+    return list(islice(matched, limit))
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Optional, List, Tuple, Mapping, Dict, Sequence
+from app.config import get_config_value
+from app.db import reader_connection, get_data_version
+from app.metrics import track_sqlite
+from app.models.flights import Flight
+
+logger = logging.getLogger(__name__)
+
+FLIGHTS_DATA_VERSION = "flights"
+
+
+def is_snapshot_enabled() -> bool:
+    return bool(get_config_value("flights.snapshot_enabled", True))
+
+
+@dataclass(frozen=True)
+class FlightSnapshot:
+    flights: Tuple[Flight, ...]
+    keys: Tuple[Tuple[str, str], ...]
+    by_type: Mapping[Tuple[str, Optional[bool]], Tuple[int, ...]]
+    by_number: Mapping[str, Tuple[int, ...]]
+    built_at: datetime
+    
+    def _matching_indices(
+        self,
+        flight_type: str,
+        flight_number: Optional[str],
+        has_delay: Optional[bool]
+    ) -> Sequence[int]:
+        indices = self.by_type.get((flight_type, has_delay), ())
+        if flight_number:
+            needle = flight_number.upper()
+            matched = set()
+            for number, number_indices in self.by_number.items():
+                if needle in number:
+                    matched.update(number_indices)
+            indices = [i for i in indices if i in matched]
+        return indices
+    
+    def select(
+        self,
+        flight_type: str,
+        flight_number: Optional[str] = None,
+        has_delay: Optional[bool] = None
+    ) -> List[Flight]:
+        return [self.flights[i] for i in self._matching_indices(flight_type, flight_number, has_delay)]
+    
+    def page(
+        self,
+        flight_type: str,
+        flight_number: Optional[str] = None,
+        has_delay: Optional[bool] = None,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[str, str]] = None
+    ) -> Tuple[List[Flight], int, bool]:
+        indices = self._matching_indices(flight_type, flight_number, has_delay)
+        start = bisect_right(indices, after, key=self.keys.__getitem__) if after else 0
+        end = len(indices) if limit is None else min(start + limit, len(indices))
+        return [self.flights[i] for i in indices[start:end]], len(indices), end < len(indices)
+
+
+_snapshot: Optional[FlightSnapshot] = None
+_snapshot_version: Optional[int] = None
+_rebuild_lock = asyncio.Lock()
+
+
+def _parse_stored_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def build_snapshot(rows: List[tuple]) -> FlightSnapshot:
+    flights = []
+    keys = []
+    by_type: Dict[Tuple[str, Optional[bool]], List[int]] = {}
+    by_number: Dict[str, List[int]] = {}
+    
+    for index, row in enumerate(rows):
+        flight_id, flight_number, destination, origin, scheduled_str, actual_str, \
+        status, gate, terminal, delay_minutes, flight_type = row
+        
+        flights.append(Flight(
+            flight_id=flight_id,
+            flight_number=flight_number,
+            destination=destination,
+            origin=origin,
+            scheduled_time=_parse_stored_datetime(scheduled_str),
+            actual_time=_parse_stored_datetime(actual_str),
+            status=status,
+            gate=gate,
+            terminal=terminal,
+            delay_minutes=delay_minutes
+        ))
+        
+        keys.append((scheduled_str or "", flight_id))
+        has_delay = bool(delay_minutes and delay_minutes > 0)
+        by_type.setdefault((flight_type, None), []).append(index)
+        by_type.setdefault((flight_type, has_delay), []).append(index)
+        by_number.setdefault(flight_number.upper(), []).append(index)
+    
+    return FlightSnapshot(
+        flights=tuple(flights),
+        keys=tuple(keys),
+        by_type=MappingProxyType({key: tuple(value) for key, value in by_type.items()}),
+        by_number=MappingProxyType({key: tuple(value) for key, value in by_number.items()}),
+        built_at=datetime.now(timezone.utc)
+    )
+
+
+async def _load_snapshot() -> FlightSnapshot:
+    global _snapshot, _snapshot_version
+    version = await get_data_version(FLIGHTS_DATA_VERSION)
+    with track_sqlite("snapshot_load"):
+        async with reader_connection() as conn:
+            cursor = await conn.execute("""
+                SELECT flight_id, flight_number, destination, origin, scheduled_time, actual_time,
+                       status, gate, terminal, delay_minutes, flight_type
+                FROM flights
+                ORDER BY scheduled_time ASC, flight_id ASC
+            """)
+            rows = await cursor.fetchall()
+    
+    snapshot = build_snapshot(rows)
+    _snapshot = snapshot
+    _snapshot_version = version
+    logger.info(f"Снимок рейсов обновлен: {len(snapshot.flights)} рейсов")
+    return snapshot
+
+
+async def rebuild_flights_snapshot() -> FlightSnapshot:
+    async with _rebuild_lock:
+        return await _load_snapshot()
+
+
+async def get_flights_snapshot() -> FlightSnapshot:
+    snapshot = _snapshot
+    if snapshot is None:
+        async with _rebuild_lock:
+            snapshot = _snapshot
+            if snapshot is None:
+                snapshot = await _load_snapshot()
+    return snapshot
+
+
+async def sync_flights_snapshot() -> bool:
+    if not is_snapshot_enabled():
+        return False
+    if _snapshot is not None and await get_data_version(FLIGHTS_DATA_VERSION) == _snapshot_version:
+        return False
+    await rebuild_flights_snapshot()
+    return True
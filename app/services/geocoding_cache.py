@@ -0,0 +1,144 @@
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from app.cache import TTLCache
+from app.config import get_config_value
+from app.db import reader_connection, writer_connection
+from app.metrics import track_sqlite, geocoding_cache_lookups
+
+logger = logging.getLogger(__name__)
+
+
+class CityNotFoundError(ValueError):
+    pass
+
+
+def normalize_city(city: str) -> str:
+    return " ".join(city.split()).lower().replace("ё", "е")
+
+
+def _get_ttl_seconds() -> float:
+    return float(get_config_value("geocoding.ttl_seconds", 30 * 24 * 3600))
+
+
+def _get_negative_ttl_seconds() -> float:
+    return float(get_config_value("geocoding.negative_ttl_seconds", 600))
+
+
+def _get_max_entries() -> int:
+    return int(get_config_value("geocoding.max_entries", 1000))
+
+
+def _is_persistent() -> bool:
+    return bool(get_config_value("geocoding.persist", True))
+
+
+class GeocodingCache:
+    def __init__(self):
+        self.memory = TTLCache.from_settings(lambda: (_get_max_entries(), _get_ttl_seconds()))
+        self.hits = 0
+        self.misses = 0
+        self.persistent_hits = 0
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_hits": self.hits - self.persistent_hits,
+            "persistent_hits": self.persistent_hits,
+            "size": len(self.memory),
+        }
+    
+    async def get_coordinates(
+        self,
+        provider: str,
+        city: str,
+        fetch: Callable[[str], Awaitable[Tuple[float, float]]]
+    ) -> Tuple[float, float]:
+        key = f"{provider}:{normalize_city(city)}"
+        
+        entry = self.memory.get_entry(key)
+        if entry is None and _is_persistent():
+            entry = await self._load(key)
+            if entry is not None:
+                self.persistent_hits += 1
+                geocoding_cache_lookups.inc(provider, "persistent_hit")
+        elif entry is not None:
+            geocoding_cache_lookups.inc(provider, "memory_hit")
+        
+        if entry is not None:
+            self.hits += 1
+            return self._unpack(entry.value)
+        
+        self.misses += 1
+        geocoding_cache_lookups.inc(provider, "miss")
+        try:
+            coordinates = await fetch(city)
+        except CityNotFoundError as e:
+            await self._store(key, (None, None, str(e)), _get_negative_ttl_seconds())
+            raise
+        
+        await self._store(key, (coordinates[0], coordinates[1], None), _get_ttl_seconds())
+        return coordinates
+    
+    @staticmethod
+    def _unpack(value: Tuple[Optional[float], Optional[float], Optional[str]]) -> Tuple[float, float]:
+        lat, lon, error = value
+        if error is not None:
+            raise CityNotFoundError(error)
+        return lat, lon
+    
+    async def _load(self, key: str):
+        with track_sqlite("geocoding_load"):
+            async with reader_connection() as conn:
+                cursor = await conn.execute(
+                    "SELECT lat, lon, error, expires_at FROM geocoding_cache WHERE key = ?",
+                    (key,)
+                )
+                row = await cursor.fetchone()
+        if row is None:
+            return None
+        lat, lon, error, expires_at = row
+        ttl = expires_at - time.time()
+        if ttl <= 0:
+            return None
+        return self.memory.set(key, (lat, lon, error), ttl)
+    
+    async def _store(self, key: str, value: Tuple[Optional[float], Optional[float], Optional[str]], ttl: float):
+        self.memory.set(key, value, ttl)
+        if not _is_persistent():
+            return
+        lat, lon, error = value
+        try:
+            with track_sqlite("geocoding_store"):
+                async with writer_connection() as conn:
+                    await conn.execute("""
+                        INSERT INTO geocoding_cache (key, lat, lon, error, expires_at)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(key) DO UPDATE SET
+                            lat = excluded.lat,
+                            lon = excluded.lon,
+                            error = excluded.error,
+                            expires_at = excluded.expires_at
+                    """, (key, lat, lon, error, time.time() + ttl))
+                    await conn.commit()
+        except Exception as e:
+            logger.warning(f"Не удалось сохранить координаты '{key}' в базу: {e}")
+    
+    async def purge_expired(self) -> int:
+        async with writer_connection() as conn:
+            cursor = await conn.execute("DELETE FROM geocoding_cache WHERE expires_at < ?", (time.time(),))
+            await conn.commit()
+            return cursor.rowcount
+    
+    async def clear(self):
+        self.memory.clear()
+        self.hits = 0
+        self.misses = 0
+        self.persistent_hits = 0
+        async with writer_connection() as conn:
+            await conn.execute("DELETE FROM geocoding_cache")
+            await conn.commit()
+
+
+geocoding_cache = GeocodingCache()
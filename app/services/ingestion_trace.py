@@ -0,0 +1,124 @@
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from app.config import get_config_value
+from app.db import reader_connection, writer_connection
+from app.metrics import track_sqlite, ingestion_last_cycle_timestamp, ingestion_last_cycle_duration, ingestion_last_cycle_rows
+from app.models.flights import IngestionCycle, IngestionStatsResponse
+
+logger = logging.getLogger(__name__)
+
+
+def _get_history_size() -> int:
+    return max(1, int(get_config_value("aviaradar.trace_history", 50)))
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class CycleTrace:
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.details_latencies: List[float] = []
+        self.feed_size = 0
+        self.details_requested = 0
+        self.commits = 0
+        self.saved = 0
+        self.skipped: Dict[str, int] = {}
+        self.error: Optional[str] = None
+    
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+    
+    def details_latency_ms(self) -> Dict[str, float]:
+        if not self.details_latencies:
+            return {}
+        ordered = sorted(self.details_latencies)
+        return {
+            "p50": round(_percentile(ordered, 50) * 1000, 1),
+            "p95": round(_percentile(ordered, 95) * 1000, 1),
+            "p99": round(_percentile(ordered, 99) * 1000, 1),
+            "max": round(ordered[-1] * 1000, 1)
+        }
+    
+    def finish(self, interval_seconds: float) -> IngestionCycle:
+        duration = time.perf_counter() - self._started
+        cycle = IngestionCycle(
+            started_at=self.started_at,
+            duration_seconds=round(duration, 3),
+            overrun=duration > interval_seconds,
+            stages={name: round(value, 3) for name, value in self.stages.items()},
+            feed_size=self.feed_size,
+            details_requested=self.details_requested,
+            details_latency_ms=self.details_latency_ms(),
+            commits=self.commits,
+            saved=self.saved,
+            skipped={reason: count for reason, count in self.skipped.items() if count},
+            error=self.error
+        )
+        return cycle
+
+
+async def save_cycle(cycle: IngestionCycle):
+    try:
+        with track_sqlite("save_ingestion_cycle"):
+            async with writer_connection() as conn:
+                cursor = await conn.execute(
+                    "INSERT INTO ingestion_cycles (started_at, cycle) VALUES (?, ?)",
+                    (cycle.started_at.isoformat(), cycle.model_dump_json())
+                )
+                await conn.execute("DELETE FROM ingestion_cycles WHERE id <= ?", (cursor.lastrowid - _get_history_size(),))
+                await conn.commit()
+    except Exception as e:
+        logger.warning(f"Не удалось сохранить трассировку цикла обновления рейсов: {e}")
+
+
+async def load_cycles(limit: Optional[int] = None) -> List[IngestionCycle]:
+    with track_sqlite("load_ingestion_cycles"):
+        async with reader_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT cycle FROM ingestion_cycles ORDER BY id DESC LIMIT ?",
+                (limit if limit is not None else _get_history_size(),)
+            )
+            rows = await cursor.fetchall()
+    return [IngestionCycle.model_validate_json(row[0]) for row in rows]
+
+
+async def get_ingestion_stats(budget_seconds: float, interval_seconds: float) -> IngestionStatsResponse:
+    cycles = await load_cycles()
+    return IngestionStatsResponse(
+        interval_seconds=interval_seconds,
+        budget_seconds=budget_seconds,
+        overruns=sum(1 for cycle in cycles if cycle.overrun),
+        cycles=cycles
+    )
+
+
+async def refresh_ingestion_metrics():
+    cycles = await load_cycles(1)
+    if not cycles:
+        return
+    cycle = cycles[0]
+    ingestion_last_cycle_timestamp.set(cycle.started_at.timestamp())
+    ingestion_last_cycle_duration.set(cycle.duration_seconds)
+    ingestion_last_cycle_rows.clear()
+    ingestion_last_cycle_rows.set(cycle.saved, "saved")
+    for reason, count in cycle.skipped.items():
+        ingestion_last_cycle_rows.set(count, reason)
+
+
+async def clear_ingestion_traces():
+    async with writer_connection() as conn:
+        await conn.execute("DELETE FROM ingestion_cycles")
+        await conn.commit()
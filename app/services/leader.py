@@ -0,0 +1,81 @@
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Optional
+from app.config import get_config_value
+from app.db import writer_connection
+
+logger = logging.getLogger(__name__)
+
+
+def is_leader_election_enabled() -> bool:
+    return bool(get_config_value("ingestion.leader_election", True))
+
+
+def get_lease_ttl_seconds() -> float:
+    return float(get_config_value("ingestion.lease_ttl_seconds", 30))
+
+
+def get_lease_renew_seconds() -> float:
+    return float(get_config_value("ingestion.lease_renew_seconds", 10))
+
+
+def make_holder_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaseElector:
+    def __init__(self, name: str, holder: Optional[str] = None, ttl_seconds: Optional[float] = None):
+        self.name = name
+        self.holder = holder or make_holder_id()
+        self.ttl_seconds = ttl_seconds
+        self.expires_at = 0.0
+    
+    @property
+    def is_leader(self) -> bool:
+        return time.time() < self.expires_at
+    
+    async def try_acquire(self) -> bool:
+        ttl = self.ttl_seconds if self.ttl_seconds is not None else get_lease_ttl_seconds()
+        now = time.time()
+        try:
+            async with writer_connection() as conn:
+                await conn.execute("""
+                    INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?)
+                    ON CONFLICT(name) DO UPDATE SET
+                        holder = excluded.holder,
+                        expires_at = excluded.expires_at
+                    WHERE leases.holder = excluded.holder OR leases.expires_at < ?
+                """, (self.name, self.holder, now + ttl, now))
+                cursor = await conn.execute("SELECT holder FROM leases WHERE name = ?", (self.name,))
+                row = await cursor.fetchone()
+                await conn.commit()
+        except Exception as e:
+            logger.warning(f"Не удалось продлить аренду '{self.name}': {e}")
+            return self.is_leader
+        
+        was_leader = self.is_leader
+        if row and row[0] == self.holder:
+            self.expires_at = now + ttl
+            if not was_leader:
+                logger.info(f"Аренда '{self.name}' получена: {self.holder}")
+            return True
+        
+        self.expires_at = 0.0
+        if was_leader:
+            logger.warning(f"Аренда '{self.name}' перехвачена: {row[0] if row else None}")
+        return False
+    
+    async def release(self):
+        if self.expires_at == 0.0:
+            return
+        self.expires_at = 0.0
+        try:
+            async with writer_connection() as conn:
+                await conn.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (self.name, self.holder))
+                await conn.commit()
+            logger.info(f"Аренда '{self.name}' освобождена: {self.holder}")
+        except Exception as e:
+            logger.warning(f"Не удалось освободить аренду '{self.name}': {e}")
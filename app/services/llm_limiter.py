@@ -0,0 +1,237 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Deque, Dict, Any, Optional
+from app.config import get_config_value
+from app.metrics import llm_limiter_queue_depth, llm_limiter_wait_duration
+
+DEFAULT_MODEL_KEY = "default"
+
+
+class UpstreamRateLimitError(Exception):
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _get_limiter_value(key: str, default: Any) -> Any:
+    return get_config_value(f"openrouter.limiter.{key}", default)
+
+
+def is_limiter_enabled() -> bool:
+    return bool(_get_limiter_value("enabled", True))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class Permit:
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.status_code: Optional[int] = None
+        self.retry_after: Optional[float] = None
+        self.latency: Optional[float] = None
+    
+    def record(self, status_code: int, retry_after: Optional[str] = None):
+        self.status_code = status_code
+        self.retry_after = parse_retry_after(retry_after)
+        self.latency = time.monotonic() - self.started_at
+
+
+class AdaptiveLimiter:
+    def __init__(
+        self,
+        initial_limit: float = 8,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        max_wait_seconds: float = 10.0,
+        latency_target_seconds: float = 30.0,
+        default_retry_after_seconds: float = 1.0,
+        backoff: float = 0.5,
+        name: str = DEFAULT_MODEL_KEY
+    ):
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.max_wait_seconds = max_wait_seconds
+        self.latency_target_seconds = latency_target_seconds
+        self.default_retry_after_seconds = default_retry_after_seconds
+        self.backoff = backoff
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.admitted = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.total_wait_seconds = 0.0
+        self.max_observed_wait_seconds = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._timer: Optional[asyncio.TimerHandle] = None
+    
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+    
+    def _has_capacity(self) -> bool:
+        return self.in_flight < max(1, int(self.limit)) and time.monotonic() >= self.blocked_until
+    
+    def _wake(self):
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+        llm_limiter_queue_depth.set(self.queue_depth, self.name)
+        
+        delay = self.blocked_until - time.monotonic()
+        if not self._waiters or delay <= 0:
+            self._cancel_timer()
+            return
+        loop = asyncio.get_running_loop()
+        when = loop.time() + delay
+        if self._timer is not None and self._timer.when() >= when:
+            return
+        self._cancel_timer()
+        self._timer = loop.call_at(when, self._on_timer)
+    
+    def _on_timer(self):
+        self._timer = None
+        self._wake()
+    
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+    
+    def _admit(self, waited: float):
+        llm_limiter_wait_duration.observe(waited, self.name)
+        self.admitted += 1
+        self.total_wait_seconds += waited
+        self.max_observed_wait_seconds = max(self.max_observed_wait_seconds, waited)
+    
+    def _reject(self, retry_after: float):
+        self.rejected += 1
+        raise UpstreamRateLimitError("Превышен лимит одновременных запросов к OpenRouter, попробуйте позже", retry_after)
+    
+    async def acquire(self):
+        started_at = time.monotonic()
+        if not self._waiters and self._has_capacity():
+            self.in_flight += 1
+            self._admit(0.0)
+            return
+        
+        if self.blocked_until - started_at > self.max_wait_seconds:
+            self._reject(self.blocked_until - started_at)
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._wake()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                self._admit(time.monotonic() - started_at)
+                return
+            waiter.cancel()
+            self._remove_waiter(waiter)
+            self._reject(max(self.blocked_until - time.monotonic(), self.default_retry_after_seconds))
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(Permit())
+            else:
+                waiter.cancel()
+                self._remove_waiter(waiter)
+            raise
+        self._admit(time.monotonic() - started_at)
+    
+    def _remove_waiter(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        llm_limiter_queue_depth.set(self.queue_depth, self.name)
+    
+    def release(self, permit: Permit):
+        self.in_flight = max(0, self.in_flight - 1)
+        latency = permit.latency if permit.latency is not None else time.monotonic() - permit.started_at
+        
+        if permit.status_code == 429:
+            self.throttled += 1
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            retry_after = permit.retry_after if permit.retry_after is not None else self.default_retry_after_seconds
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+        elif permit.status_code is not None and permit.status_code < 500:
+            if latency <= self.latency_target_seconds:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            else:
+                self.limit = max(self.min_limit, self.limit * 0.9)
+        
+        self._wake()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+            "avg_wait_seconds": self.total_wait_seconds / self.admitted if self.admitted else 0.0,
+            "max_wait_seconds": self.max_observed_wait_seconds,
+            "blocked_for_seconds": max(0.0, self.blocked_until - time.monotonic()),
+        }
+
+
+class ModelLimiters:
+    def __init__(self):
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+    
+    def get(self, model: Optional[str]) -> AdaptiveLimiter:
+        key = model or DEFAULT_MODEL_KEY
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = AdaptiveLimiter(
+                initial_limit=float(_get_limiter_value("initial_limit", 8)),
+                min_limit=float(_get_limiter_value("min_limit", 1)),
+                max_limit=float(_get_limiter_value("max_limit", 64)),
+                max_wait_seconds=float(_get_limiter_value("max_wait_seconds", 10)),
+                latency_target_seconds=float(_get_limiter_value("latency_target_seconds", 30)),
+                default_retry_after_seconds=float(_get_limiter_value("default_retry_after_seconds", 1)),
+                name=key
+            )
+            self._limiters[key] = limiter
+        return limiter
+    
+    @asynccontextmanager
+    async def slot(self, model: Optional[str]) -> AsyncIterator[Permit]:
+        if not is_limiter_enabled():
+            yield Permit()
+            return
+        limiter = self.get(model)
+        await limiter.acquire()
+        permit = Permit()
+        try:
+            yield permit
+        finally:
+            limiter.release(permit)
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {model: limiter.stats() for model, limiter in self._limiters.items()}
+    
+    def clear(self):
+        self._limiters.clear()
+
+
+model_limiters = ModelLimiters()
@@ -1,11 +1,18 @@
-import httpx
-from typing import Tuple, List
-from datetime import datetime, date
+from typing import Tuple, List, Dict, Any
+from datetime import datetime, date, timedelta
+from app.cache import TTLCache, SingleFlight
+from app.clients import http_client
+from app.config import get_config_value
+from app.metrics import track_upstream
 from app.models.weather import WeatherResponse, DayWeather
+from app.services.geocoding_cache import geocoding_cache, CityNotFoundError
 
 GEOCODING_API_BASE = "https://geocoding-api.open-meteo.com/v1"
 WEATHER_API_BASE = "https://api.open-meteo.com/v1"
 
+FORECAST_HORIZON_DAYS = 16
+DAILY_FIELDS = "weathercode,temperature_2m_max,temperature_2m_min"
+
 WEATHER_CODES = {
     0: "Ясно",
     1: "Преимущественно ясно",
@@ -39,6 +46,10 @@ WEATHER_CODES = {
 
 
 async def _get_city_coordinates(city_name: str) -> Tuple[float, float]:
+    return await geocoding_cache.get_coordinates("openmeteo", city_name, _fetch_city_coordinates)
+
+
+async def _fetch_city_coordinates(city_name: str) -> Tuple[float, float]:
     url = f"{GEOCODING_API_BASE}/search"
     params = {
         "name": city_name,
@@ -46,28 +57,84 @@ async def _get_city_coordinates(city_name: str) -> Tuple[float, float]:
         "language": "ru"
     }
     
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.get(url, params=params)
-        response.raise_for_status()
+    async with http_client("openmeteo") as client:
+        with track_upstream("openmeteo", "geocode"):
+            response = await client.get(url, params=params)
+            response.raise_for_status()
         data = response.json()
         
         results = data.get("results", [])
         if not results:
-            raise ValueError(f"Город '{city_name}' не найден")
+            raise CityNotFoundError(f"Город '{city_name}' не найден")
         
         city_data = results[0]
         latitude = city_data.get("latitude")
         longitude = city_data.get("longitude")
         
         if latitude is None or longitude is None:
-            raise ValueError(f"Не удалось получить координаты для города '{city_name}'")
+            raise CityNotFoundError(f"Не удалось получить координаты для города '{city_name}'")
         
         return latitude, longitude
 
 
-async def get_weather_by_city_and_dates(city: str, date_from: str, date_to: str) -> WeatherResponse:
-    latitude, longitude = await _get_city_coordinates(city)
+def _get_forecast_ttl_seconds() -> float:
+    return float(get_config_value("openmeteo.forecast_ttl_seconds", 3600))
+
+
+def _get_coordinates_precision() -> int:
+    return int(get_config_value("openmeteo.coordinates_precision", 2))
+
+
+def _get_forecast_cache_options() -> Tuple[int, float]:
+    return int(get_config_value("openmeteo.forecast_cache_size", 1000)), _get_forecast_ttl_seconds()
+
+
+_forecast_cache = TTLCache.from_settings(_get_forecast_cache_options)
+_forecast_flights = SingleFlight()
+
+
+def clear_forecast_cache():
+    _forecast_cache.clear()
+
+
+async def _request_forecast(params: Dict[str, Any]) -> Dict[str, Any]:
+    url = f"{WEATHER_API_BASE}/forecast"
+    async with http_client("openmeteo") as client:
+        with track_upstream("openmeteo", "forecast") as timer:
+            response = await client.get(url, params=params)
+            timer.check(response.status_code)
+        if response.status_code == 400:
+            error_data = response.json()
+            error_msg = error_data.get("reason", "Ошибка запроса к API погоды")
+            raise ValueError(f"Ошибка API: {error_msg}")
+        response.raise_for_status()
+        data = response.json()
+    return data.get("daily", {})
+
+
+async def _get_forecast_window(latitude: float, longitude: float, today: date) -> Dict[str, Any]:
+    precision = _get_coordinates_precision()
+    key = (round(latitude, precision), round(longitude, precision), today.isoformat())
+    
+    entry = _forecast_cache.get_entry(key)
+    if entry is not None:
+        return entry.value
     
+    async def fetch():
+        daily = await _request_forecast({
+            "latitude": key[0],
+            "longitude": key[1],
+            "daily": DAILY_FIELDS,
+            "timezone": "auto",
+            "forecast_days": FORECAST_HORIZON_DAYS
+        })
+        _forecast_cache.set(key, daily, _get_forecast_ttl_seconds())
+        return daily
+    
+    return await _forecast_flights.do(key, fetch)
+
+
+async def get_weather_by_city_and_dates(city: str, date_from: str, date_to: str) -> WeatherResponse:
     today = date.today()
     try:
         from_date = datetime.strptime(date_from, "%Y-%m-%d").date()
@@ -78,66 +145,55 @@ async def get_weather_by_city_and_dates(city: str, date_from: str, date_to: str)
     if from_date > to_date:
         raise ValueError("Дата начала должна быть раньше или равна дате окончания")
     
-    url = f"{WEATHER_API_BASE}/forecast"
-    params = {
-        "latitude": latitude,
-        "longitude": longitude,
-        "daily": "weathercode,temperature_2m_max,temperature_2m_min",
-        "timezone": "auto"
-    }
+    latitude, longitude = await _get_city_coordinates(city)
     
-    if from_date >= today:
-        params["start_date"] = date_from
-        params["end_date"] = date_to
+    if to_date < today:
+        raise ValueError("Указанные даты находятся в прошлом. Open-Meteo API поддерживает только прогноз на будущее (до 16 дней)")
+    
+    horizon_end = today + timedelta(days=FORECAST_HORIZON_DAYS - 1)
+    if from_date < today or to_date <= horizon_end:
+        daily = await _get_forecast_window(latitude, longitude, today)
     else:
-        forecast_days = (to_date - today).days + 1
-        if forecast_days > 0:
-            params["forecast_days"] = min(forecast_days, 16)
-        else:
-            raise ValueError("Указанные даты находятся в прошлом. Open-Meteo API поддерживает только прогноз на будущее (до 16 дней)")
+        daily = await _request_forecast({
+            "latitude": latitude,
+            "longitude": longitude,
+            "daily": DAILY_FIELDS,
+            "timezone": "auto",
+            "start_date": date_from,
+            "end_date": date_to
+        })
     
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.get(url, params=params)
-        if response.status_code == 400:
-            error_data = response.json()
-            error_msg = error_data.get("reason", "Ошибка запроса к API погоды")
-            raise ValueError(f"Ошибка API: {error_msg}")
-        response.raise_for_status()
-        data = response.json()
+    dates = daily.get("time", [])
+    temperature_max = daily.get("temperature_2m_max", [])
+    temperature_min = daily.get("temperature_2m_min", [])
+    weathercode = daily.get("weathercode", [])
+    
+    days: List[DayWeather] = []
+    
+    for i, date_str in enumerate(dates):
+        day_date = datetime.strptime(date_str, "%Y-%m-%d").date()
         
-        daily = data.get("daily", {})
-        dates = daily.get("time", [])
-        temperature_max = daily.get("temperature_2m_max", [])
-        temperature_min = daily.get("temperature_2m_min", [])
-        weathercode = daily.get("weathercode", [])
+        if day_date < from_date or day_date > to_date:
+            continue
         
-        days: List[DayWeather] = []
+        temp_max = temperature_max[i] if i < len(temperature_max) else None
+        temp_min = temperature_min[i] if i < len(temperature_min) else None
+        temp_avg = None
+        if temp_max is not None and temp_min is not None:
+            temp_avg = (temp_max + temp_min) / 2
         
-        for i, date_str in enumerate(dates):
-            day_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-            
-            if day_date < from_date or day_date > to_date:
-                continue
-            
-            temp_max = temperature_max[i] if i < len(temperature_max) else None
-            temp_min = temperature_min[i] if i < len(temperature_min) else None
-            temp_avg = None
-            if temp_max is not None and temp_min is not None:
-                temp_avg = (temp_max + temp_min) / 2
-            
-            code = weathercode[i] if i < len(weathercode) else None
-            condition = WEATHER_CODES.get(code, f"Код погоды: {code}") if code is not None else None
-            
-            days.append(DayWeather(
-                date=date_str,
-                temperature_max=temp_max,
-                temperature_min=temp_min,
-                temperature_avg=temp_avg,
-                condition=condition
-            ))
+        code = weathercode[i] if i < len(weathercode) else None
+        condition = WEATHER_CODES.get(code, f"Код погоды: {code}") if code is not None else None
         
-        return WeatherResponse(
-            city=city,
-            days=days
-        )
-
+        days.append(DayWeather(
+            date=date_str,
+            temperature_max=temp_max,
+            temperature_min=temp_min,
+            temperature_avg=temp_avg,
+            condition=condition
+        ))
+    
+    return WeatherResponse(
+        city=city,
+        days=days
+    )
@@ -1,25 +1,216 @@
-import httpx
+import hashlib
+import json
 import logging
-from typing import Dict, Any, Optional
-from app.config import get_config_value
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Any, Optional, Tuple
+import httpx
+from app.cache import TTLCache, SingleFlight
+from app.clients import http_client
+from app.config import get_config_value, get_settings
+from app.metrics import track_upstream
+from app.services.llm_limiter import model_limiters, parse_retry_after, UpstreamRateLimitError
 
 logger = logging.getLogger(__name__)
 
 
 def _get_base_url() -> str:
-    return get_config_value("openrouter.llm_base_url", "https://openrouter.ai/api/v1")
+    return get_settings().openrouter.llm_base_url
 
 
 def _get_api_key() -> str:
-    return get_config_value("openrouter.llm_api_key", "")
+    return get_settings().openrouter.llm_api_key
 
 
 def _get_model() -> str:
-    return get_config_value("openrouter.llm_model", "x-ai/grok-code-fast-1")
+    return get_settings().openrouter.llm_model
+
+
+def _is_response_cache_enabled() -> bool:
+    return bool(get_config_value("openrouter.response_cache_enabled", False))
+
+
+def _get_response_cache_ttl_seconds() -> float:
+    return float(get_config_value("openrouter.response_cache_ttl_seconds", 300))
+
+
+def _get_models_cache_ttl_seconds() -> float:
+    return float(get_config_value("openrouter.models_cache_ttl_seconds", 3600))
+
+
+def _get_response_cache_options() -> Tuple[int, float]:
+    return int(get_config_value("openrouter.response_cache_max_entries", 500)), _get_response_cache_ttl_seconds()
+
+
+_response_cache = TTLCache.from_settings(_get_response_cache_options)
+_response_flights = SingleFlight()
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    data: Dict[str, Any]
+    cache_status: str
+    age: float = 0.0
+
+
+def clear_response_cache():
+    _response_cache.clear()
+
+
+def response_cache_stats() -> Dict[str, int]:
+    return {
+        "hits": _response_cache.hits,
+        "misses": _response_cache.misses,
+        "size": len(_response_cache),
+    }
+
+
+def _cache_key(method: str, path: str, data: Optional[Dict[str, Any]], params: Optional[Dict[str, Any]]) -> str:
+    canonical = json.dumps(
+        {"method": method.upper(), "path": path.strip("/"), "model": (data or {}).get("model"), "data": data, "params": params},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _is_cacheable_completion(data: Dict[str, Any]) -> bool:
+    return _is_response_cache_enabled() and not data.get("stream") and data.get("temperature") == 0 and data.get("n", 1) == 1
+
+
+async def cached_proxy_request(
+    method: str,
+    path: str,
+    ttl: float,
+    data: Optional[Dict[str, Any]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    bypass: bool = False
+) -> CachedResponse:
+    if bypass:
+        return CachedResponse(data=await proxy_request(method, path, data=data, params=params), cache_status="BYPASS")
+    
+    key = _cache_key(method, path, data, params)
+    entry = _response_cache.get_entry(key)
+    if entry is not None:
+        return CachedResponse(data=entry.value, cache_status="HIT", age=entry.age)
+    
+    async def fetch():
+        result = await proxy_request(method, path, data=data, params=params)
+        _response_cache.set(key, result, ttl)
+        return result
+    
+    return CachedResponse(data=await _response_flights.do(key, fetch), cache_status="MISS")
+
+
+async def create_chat_completion(data: Dict[str, Any], bypass_cache: bool = False) -> CachedResponse:
+    bypass = bypass_cache or not _is_cacheable_completion(data)
+    return await cached_proxy_request("POST", "chat/completions", _get_response_cache_ttl_seconds(), data=data, bypass=bypass)
 
 
-def _get_proxy() -> Optional[str]:
-    return get_config_value("openrouter.proxy", None)
+async def list_models(bypass_cache: bool = False) -> CachedResponse:
+    return await cached_proxy_request("GET", "models", _get_models_cache_ttl_seconds(), bypass=bypass_cache)
+
+
+def _build_url(path: str) -> str:
+    return f"{_get_base_url().rstrip('/')}/{path.lstrip('/')}"
+
+
+class UpstreamStream:
+    def __init__(self, response: httpx.Response, exit_stack: AsyncExitStack):
+        self.response = response
+        self._exit_stack = exit_stack
+    
+    @property
+    def status_code(self) -> int:
+        return self.response.status_code
+    
+    @property
+    def media_type(self) -> Optional[str]:
+        return self.response.headers.get("content-type")
+    
+    @property
+    def retry_after(self) -> Optional[str]:
+        return self.response.headers.get("retry-after")
+    
+    async def iter_bytes(self) -> AsyncIterator[bytes]:
+        try:
+            if self.response.is_stream_consumed:
+                yield self.response.content
+                return
+            async for chunk in self.response.aiter_raw():
+                yield chunk
+        finally:
+            await self.aclose()
+    
+    async def aclose(self):
+        await self._exit_stack.aclose()
+
+
+def _raise_for_status(response: httpx.Response):
+    if response.status_code == 429:
+        retry_after = parse_retry_after(response.headers.get("retry-after"))
+        raise UpstreamRateLimitError("OpenRouter ограничил частоту запросов, попробуйте позже", retry_after if retry_after is not None else 1.0)
+    response.raise_for_status()
+
+
+async def _open_upstream(
+    method: str,
+    path: str,
+    headers: Dict[str, str],
+    json_data: Optional[Dict[str, Any]] = None,
+    content: Optional[bytes] = None,
+    params: Optional[Dict[str, Any]] = None,
+    raise_for_status: bool = True,
+    model: Optional[str] = None
+) -> UpstreamStream:
+    api_key = _get_api_key()
+    if not api_key:
+        raise ValueError("OpenRouter API key not configured")
+    
+    headers = {"Authorization": f"Bearer {api_key}", "Accept-Encoding": "identity", **headers}
+    
+    if model is None and json_data is not None:
+        model = json_data.get("model")
+    
+    exit_stack = AsyncExitStack()
+    try:
+        permit = await exit_stack.enter_async_context(model_limiters.slot(model))
+        client = await exit_stack.enter_async_context(http_client("openrouter"))
+        request = client.build_request(method, _build_url(path), headers=headers, json=json_data, content=content, params=params)
+        with track_upstream("openrouter", "open_stream") as timer:
+            response = await client.send(request, stream=True)
+            timer.check(response.status_code)
+        exit_stack.push_async_callback(response.aclose)
+        permit.record(response.status_code, response.headers.get("retry-after"))
+        
+        if response.status_code != 200:
+            await response.aread()
+            logger.error(f"OpenRouter API error: {response.status_code}, response: {response.text}")
+            if raise_for_status:
+                _raise_for_status(response)
+    except BaseException:
+        await exit_stack.aclose()
+        raise
+    
+    return UpstreamStream(response, exit_stack)
+
+
+async def stream_request(path: str, data: Dict[str, Any]) -> UpstreamStream:
+    headers = {"Content-Type": "application/json", "Accept": "text/event-stream"}
+    return await _open_upstream("POST", path, headers, json_data=data)
+
+
+async def passthrough_request(
+    method: str,
+    path: str,
+    body: Optional[bytes] = None,
+    params: Optional[Dict[str, Any]] = None,
+    content_type: Optional[str] = None,
+    model: Optional[str] = None
+) -> UpstreamStream:
+    headers = {"Content-Type": content_type} if content_type else {}
+    return await _open_upstream(method, path, headers, content=body, params=params, raise_for_status=False, model=model)
 
 
 async def proxy_request(
@@ -28,38 +219,39 @@ async def proxy_request(
     data: Optional[Dict[str, Any]] = None,
     params: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
-    base_url = _get_base_url()
     api_key = _get_api_key()
-    proxy = _get_proxy()
     
     if not api_key:
         raise ValueError("OpenRouter API key not configured")
     
-    url = f"{base_url.rstrip('/')}/{path.lstrip('/')}"
+    url = _build_url(path)
     
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json"
     }
     
-    client_kwargs = {"timeout": 60.0}
-    if proxy:
-        client_kwargs["proxy"] = proxy
-    
-    async with httpx.AsyncClient(**client_kwargs) as client:
-        if method.upper() == "GET":
-            response = await client.get(url, headers=headers, params=params)
-        elif method.upper() == "POST":
-            response = await client.post(url, headers=headers, json=data, params=params)
-        elif method.upper() == "PUT":
-            response = await client.put(url, headers=headers, json=data, params=params)
-        elif method.upper() == "DELETE":
-            response = await client.delete(url, headers=headers, params=params)
-        else:
+    async with model_limiters.slot((data or {}).get("model")) as permit, http_client("openrouter") as client:
+        if method.upper() not in ("GET", "POST", "PUT", "DELETE"):
             raise ValueError(f"Unsupported HTTP method: {method}")
+        with track_upstream("openrouter", "request") as timer:
+            if method.upper() == "GET":
+                response = await client.get(url, headers=headers, params=params)
+            elif method.upper() == "POST":
+                response = await client.post(url, headers=headers, json=data, params=params)
+            elif method.upper() == "PUT":
+                response = await client.put(url, headers=headers, json=data, params=params)
+            else:
+                response = await client.delete(url, headers=headers, params=params)
+            timer.check(response.status_code)
         
+        permit.record(response.status_code, response.headers.get("retry-after"))
         if response.status_code != 200:
             logger.error(f"OpenRouter API error: {response.status_code}, response: {response.text}")
-        response.raise_for_status()
+        _raise_for_status(response)
         return response.json()
 
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    return model_limiters.stats()
+
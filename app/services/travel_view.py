@@ -0,0 +1,245 @@
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.cache import TTLCache
+from app.config import get_config_value
+from app.models.flights import Flight
+from app.models.twogis import Hotel
+from app.models.weather import WeatherResponse
+from app.models.widgets import WidgetViewResponse, Widget, Item, Action
+from app.services.aviaradar import list_flights_to
+from app.services.geocoding_cache import normalize_city
+from app.services.openmeteo import get_weather_by_city_and_dates
+from app.services.twogis import get_cached_hotels
+
+logger = logging.getLogger(__name__)
+
+SOURCE_LIVE = "live"
+SOURCE_CACHED = "cached"
+SOURCE_PLACEHOLDER = "placeholder"
+
+
+def _get_deadline_seconds() -> float:
+    return float(get_config_value("widgets.live_deadline_seconds", 2.0))
+
+
+def _get_default_city() -> str:
+    return get_config_value("widgets.travel_city", "Санкт-Петербург")
+
+
+def _get_flights_limit() -> int:
+    return int(get_config_value("widgets.live_flights_limit", 5))
+
+
+def _get_city_airports(city: str) -> List[str]:
+    airports = get_config_value("widgets.travel_airports", {}) or {}
+    for name, codes in airports.items():
+        if normalize_city(name) == normalize_city(city):
+            return list(codes)
+    return []
+
+
+_last_good = TTLCache.from_settings(lambda: (256, float(get_config_value("widgets.live_fallback_ttl_seconds", 6 * 3600))))
+_background_fetches = set()
+
+
+def clear_travel_view_cache():
+    _last_good.clear()
+
+
+def _remember(key: Tuple[str, str], task: "asyncio.Task"):
+    _background_fetches.discard(task)
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        logger.warning(f"Источник {key[0]} для витрины путешествия недоступен: {error}")
+        return
+    _last_good.set(key, task.result())
+
+
+async def _gather_with_deadline(
+    sources: Dict[str, Callable[[], Awaitable[Any]]],
+    city_key: str,
+    deadline: float
+) -> Dict[str, Tuple[Any, str]]:
+    tasks = {}
+    for name, fetch in sources.items():
+        task = asyncio.ensure_future(fetch())
+        task.add_done_callback(lambda done, key=(name, city_key): _remember(key, done))
+        _background_fetches.add(task)
+        tasks[name] = task
+    
+    await asyncio.wait(tasks.values(), timeout=deadline)
+    
+    results = {}
+    for name, task in tasks.items():
+        if task.done() and not task.cancelled() and task.exception() is None:
+            results[name] = (task.result(), SOURCE_LIVE)
+            continue
+        entry = _last_good.get_entry((name, city_key), allow_expired=True)
+        if entry is not None:
+            results[name] = (entry.value, SOURCE_CACHED)
+        else:
+            results[name] = (None, SOURCE_PLACEHOLDER)
+    return results
+
+
+def _placeholder_items(widget_id: str) -> List[Item]:
+    return [Item(id=f"{widget_id}_placeholder", text="Данные загружаются", subtitle="Обновите витрину чуть позже")]
+
+
+def _flights_widget(flights: Optional[List[Flight]], source: str, group_datetime: str) -> Widget:
+    items = []
+    for flight in flights or []:
+        route = " → ".join(part for part in (flight.origin, flight.destination) if part)
+        scheduled = flight.scheduled_time.strftime("%d.%m %H:%M") if flight.scheduled_time else "время уточняется"
+        item_id = f"flight_{flight.flight_id or flight.flight_number}"
+        items.append(Item(
+            id=item_id,
+            text=f"{flight.flight_number} {route}".strip(),
+            subtitle=f"{scheduled}, {flight.status}",
+            icon="✈️",
+            metadata={"delay_minutes": flight.delay_minutes, "gate": flight.gate, "terminal": flight.terminal},
+            actions=[
+                Action(
+                    id=f"action_select_{item_id}",
+                    type="send_message",
+                    button_text="Выбрать",
+                    message=f"Выбрать рейс {flight.flight_number} {route} на {scheduled}"
+                )
+            ]
+        ))
+    
+    return Widget(
+        id="widget_flights",
+        type="large_card_carousel",
+        title="Выберите авиабилеты",
+        group="Подготовка",
+        group_order=1,
+        datetime=group_datetime,
+        order=1,
+        items=items or _placeholder_items("widget_flights"),
+        data={"source": source}
+    )
+
+
+def _hotel_widgets(hotels: Optional[List[Hotel]], source: str, day: str, group_datetime: str) -> List[Widget]:
+    hotel = hotels[0] if hotels else None
+    if hotel is not None:
+        hotel_items = [Item(
+            id=f"hotel_{hotel.id}",
+            text=hotel.name,
+            subtitle=hotel.address,
+            image_url=hotel.photos[0] if hotel.photos else None,
+            metadata={"rating": hotel.rating, "phone": hotel.phone}
+        )]
+        hotel_actions = [Action(id="action_open_map", type="open_url", button_text="Открыть на карте", url=hotel.url)]
+    else:
+        hotel_items = _placeholder_items("widget_hotel_day1")
+        hotel_actions = None
+    
+    markers = [
+        {"lat": item.lat, "lon": item.lon, "title": item.name}
+        for item in hotels or []
+        if item.lat is not None and item.lon is not None
+    ]
+    map_data: Dict[str, Any] = {"zoom": 13, "markers": markers, "source": source}
+    if markers:
+        map_data["center"] = {"lat": markers[0]["lat"], "lon": markers[0]["lon"]}
+    
+    return [
+        Widget(
+            id="widget_hotel_day1",
+            type="card_with_button",
+            title="Ваш отель",
+            group=day,
+            group_order=2,
+            datetime=group_datetime,
+            order=1,
+            items=hotel_items,
+            actions=hotel_actions,
+            data={"source": source}
+        ),
+        Widget(
+            id="widget_map_hotel",
+            type="map",
+            title="Карта отелей",
+            group=day,
+            group_order=2,
+            datetime=group_datetime,
+            order=2,
+            data=map_data
+        )
+    ]
+
+
+def _weather_widget(weather: Optional[WeatherResponse], source: str, day: str, group_datetime: str) -> Widget:
+    items = []
+    for day_weather in weather.days if weather else []:
+        temperatures = "/".join(
+            f"{value:+.0f}°" for value in (day_weather.temperature_max, day_weather.temperature_min) if value is not None
+        )
+        items.append(Item(
+            id=f"weather_{day_weather.date}",
+            text=day_weather.date,
+            subtitle=", ".join(part for part in (temperatures, day_weather.condition) if part),
+            icon="🌤️"
+        ))
+    
+    return Widget(
+        id="widget_weather",
+        type="small_card_carousel",
+        title="Погода",
+        group=day,
+        group_order=2,
+        datetime=group_datetime,
+        order=3,
+        items=items or _placeholder_items("widget_weather"),
+        data={"source": source}
+    )
+
+
+async def build_live_travel_view(goal_id: Optional[str], city: Optional[str] = None) -> WidgetViewResponse:
+    city = city or _get_default_city()
+    today = date.today()
+    day = today.isoformat()
+    last_day = (today + timedelta(days=2)).isoformat()
+    
+    airports = _get_city_airports(city)
+    sources = {
+        "hotels": lambda: _fetch_hotels(city),
+        "weather": lambda: get_weather_by_city_and_dates(city, day, last_day),
+    }
+    if airports:
+        sources["flights"] = lambda: _fetch_flights(airports)
+    
+    results = await _gather_with_deadline(sources, normalize_city(city), _get_deadline_seconds())
+    
+    hotels, hotels_source = results["hotels"]
+    weather, weather_source = results["weather"]
+    
+    widgets = []
+    if airports:
+        flights, flights_source = results["flights"]
+        widgets.append(_flights_widget(flights, flights_source, f"{day}T10:00:00"))
+    widgets.extend(_hotel_widgets(hotels, hotels_source, day, f"{day}T11:00:00"))
+    widgets.append(_weather_widget(weather, weather_source, day, f"{day}T11:00:00"))
+    
+    return WidgetViewResponse(
+        view_id="travel_view_live",
+        title=f"Поездка: {city}",
+        goal_id=goal_id,
+        context="travel",
+        widgets=widgets
+    )
+
+
+async def _fetch_flights(airports: List[str]) -> List[Flight]:
+    return await list_flights_to(airports, _get_flights_limit())
+
+
+async def _fetch_hotels(city: str) -> List[Hotel]:
+    result = await get_cached_hotels(city)
+    return result.hotels
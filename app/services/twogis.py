@@ -1,9 +1,14 @@
-from typing import Optional, List
-import httpx
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Tuple
+import asyncio
 import logging
 from urllib.parse import urlencode
-from app.config import get_config_value
+from app.cache import TTLCache, SingleFlight
+from app.clients import http_client
+from app.config import get_config_value, get_settings
+from app.metrics import track_upstream
 from app.models.twogis import Hotel
+from app.services.geocoding_cache import geocoding_cache, CityNotFoundError, normalize_city
 
 logger = logging.getLogger(__name__)
 
@@ -13,10 +18,14 @@ STATIC_API_BASE = "http://static.maps.2gis.com"
 
 
 def _get_api_key() -> str:
-    return get_config_value("twogis.api_key", "")
+    return get_settings().twogis.api_key
 
 
 async def _get_city_coordinates(city: str) -> tuple[float, float]:
+    return await geocoding_cache.get_coordinates("twogis", city, _fetch_city_coordinates)
+
+
+async def _fetch_city_coordinates(city: str) -> tuple[float, float]:
     api_key = _get_api_key()
     if not api_key:
         raise ValueError("2GIS API key not configured")
@@ -29,8 +38,10 @@ async def _get_city_coordinates(city: str) -> tuple[float, float]:
         "fields": "items.point"
     }
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(geocoder_url, params=params)
+    async with http_client("twogis") as client:
+        with track_upstream("twogis", "geocode") as timer:
+            response = await client.get(geocoder_url, params=params)
+            timer.check(response.status_code)
         if response.status_code != 200:
             logger.error(f"2GIS Geocoder API error: {response.status_code}, response: {response.text}")
         response.raise_for_status()
@@ -39,7 +50,7 @@ async def _get_city_coordinates(city: str) -> tuple[float, float]:
         result = data.get("result", {})
         items = result.get("items", [])
         if not items:
-            raise ValueError(f"Город '{city}' не найден")
+            raise CityNotFoundError(f"Город '{city}' не найден")
         
         city_item = None
         for item in items:
@@ -55,11 +66,89 @@ async def _get_city_coordinates(city: str) -> tuple[float, float]:
         lon = point.get("lon")
         
         if lat is None or lon is None:
-            raise ValueError(f"Не удалось получить координаты для города '{city}'")
+            raise CityNotFoundError(f"Не удалось получить координаты для города '{city}'")
         
         return lat, lon
 
 
+def _get_photos_concurrency() -> int:
+    return int(get_config_value("twogis.photos_concurrency", 5))
+
+
+def _get_photos_ttl_seconds() -> float:
+    return float(get_config_value("twogis.photos_ttl_seconds", 86400))
+
+
+def _get_photos_cache_options() -> Tuple[int, float]:
+    return int(get_config_value("twogis.photos_cache_size", 5000)), _get_photos_ttl_seconds()
+
+
+_photos_cache = TTLCache.from_settings(_get_photos_cache_options)
+
+
+def clear_photos_cache():
+    _photos_cache.clear()
+
+
+def _parse_photo_urls(photos_data: dict) -> Optional[List[str]]:
+    photos_items = photos_data.get("result", {}).get("items", [])
+    if not photos_items:
+        return None
+    
+    photos = []
+    for photo in photos_items[0].get("photos", []) or []:
+        photo_url = photo.get("url") or photo.get("thumbnail_url") or photo.get("image_url") or photo.get("href")
+        if photo_url:
+            if not photo_url.startswith("http"):
+                photo_url = f"https://photo.2gis.com{photo_url}" if photo_url.startswith("/") else f"https://photo.2gis.com/{photo_url}"
+            photos.append(photo_url)
+    return photos or None
+
+
+async def _fetch_hotel_photos(client, hotel_id: str, api_key: str, semaphore: asyncio.Semaphore) -> Optional[List[str]]:
+    photos_url = f"{CATALOG_API_BASE}/3.0/items/byid"
+    photos_params = {
+        "id": hotel_id,
+        "key": api_key,
+        "fields": "items.photos"
+    }
+    try:
+        async with semaphore:
+            with track_upstream("twogis", "photos") as timer:
+                photos_response = await client.get(photos_url, params=photos_params)
+                timer.check(photos_response.status_code)
+        if photos_response.status_code != 200:
+            return None
+        photos = _parse_photo_urls(photos_response.json())
+    except Exception as e:
+        logger.debug(f"Не удалось получить фотографии для отеля {hotel_id}: {e}")
+        return None
+    
+    _photos_cache.set(hotel_id, photos, _get_photos_ttl_seconds())
+    return photos
+
+
+async def _get_hotels_photos(hotel_ids: List[str], api_key: str) -> Dict[str, Optional[List[str]]]:
+    photos_by_id = {}
+    missing = []
+    for hotel_id in hotel_ids:
+        entry = _photos_cache.get_entry(hotel_id)
+        if entry is not None:
+            photos_by_id[hotel_id] = entry.value
+        else:
+            missing.append(hotel_id)
+    
+    if missing:
+        semaphore = asyncio.Semaphore(max(1, _get_photos_concurrency()))
+        async with http_client("twogis") as client:
+            results = await asyncio.gather(*(
+                _fetch_hotel_photos(client, hotel_id, api_key, semaphore) for hotel_id in missing
+            ))
+        photos_by_id.update(zip(missing, results))
+    
+    return photos_by_id
+
+
 async def search_hotels(city: str, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Hotel]:
     api_key = _get_api_key()
     if not api_key:
@@ -77,14 +166,17 @@ async def search_hotels(city: str, date_from: Optional[str] = None, date_to: Opt
         "fields": "items.point,items.address_name,items.address,items.rating,items.contact_groups,items.flags"
     }
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(url, params=params)
+    async with http_client("twogis") as client:
+        with track_upstream("twogis", "catalog") as timer:
+            response = await client.get(url, params=params)
+            timer.check(response.status_code)
         if response.status_code != 200:
             logger.error(f"2GIS API error: {response.status_code}, response: {response.text}")
         response.raise_for_status()
         data = response.json()
     
     hotels = []
+    hotel_ids_with_photos = []
     result = data.get("result", {})
     items = result.get("items", [])
     
@@ -132,36 +224,9 @@ async def search_hotels(city: str, date_from: Optional[str] = None, date_to: Opt
         
         hotel_url = f"https://2gis.ru/firm/{hotel_id}"
         
-        photos = None
         flags = item.get("flags", {})
         if flags.get("photos"):
-            try:
-                photos_url = f"{CATALOG_API_BASE}/3.0/items/byid"
-                photos_params = {
-                    "id": hotel_id,
-                    "key": api_key,
-                    "fields": "items.photos"
-                }
-                async with httpx.AsyncClient(timeout=10.0) as photos_client:
-                    photos_response = await photos_client.get(photos_url, params=photos_params)
-                    if photos_response.status_code == 200:
-                        photos_data = photos_response.json()
-                        photos_items = photos_data.get("result", {}).get("items", [])
-                        if photos_items:
-                            hotel_photos = photos_items[0].get("photos", [])
-                            if hotel_photos:
-                                photos = []
-                                for photo in hotel_photos:
-                                    photo_url = photo.get("url") or photo.get("thumbnail_url") or photo.get("image_url") or photo.get("href")
-                                    if photo_url:
-                                        if not photo_url.startswith("http"):
-                                            photo_url = f"https://photo.2gis.com{photo_url}" if photo_url.startswith("/") else f"https://photo.2gis.com/{photo_url}"
-                                        photos.append(photo_url)
-                                if not photos:
-                                    photos = None
-            except Exception as e:
-                logger.debug(f"Не удалось получить фотографии для отеля {hotel_id}: {e}")
-                photos = None
+            hotel_ids_with_photos.append(hotel_id)
         
         hotel = Hotel(
             id=hotel_id,
@@ -172,14 +237,76 @@ async def search_hotels(city: str, date_from: Optional[str] = None, date_to: Opt
             rating=rating,
             phone=phone,
             website=website,
-            url=hotel_url,
-            photos=photos
+            url=hotel_url
         )
         hotels.append(hotel)
     
+    if hotel_ids_with_photos:
+        photos_by_id = await _get_hotels_photos(hotel_ids_with_photos, api_key)
+        for hotel in hotels:
+            hotel.photos = photos_by_id.get(hotel.id)
+    
     return hotels
 
 
+def _get_hotels_ttl_seconds() -> float:
+    return float(get_config_value("twogis.hotels_ttl_seconds", 3600))
+
+
+def _get_hotels_max_stale_seconds() -> float:
+    return float(get_config_value("twogis.hotels_max_stale_seconds", 24 * 3600))
+
+
+def _get_hotels_cache_options() -> Tuple[int, float]:
+    return int(get_config_value("twogis.hotels_cache_size", 500)), _get_hotels_ttl_seconds()
+
+
+_hotels_cache = TTLCache.from_settings(_get_hotels_cache_options)
+_hotels_flights = SingleFlight()
+_background_refreshes = set()
+
+
+@dataclass(frozen=True)
+class CachedHotels:
+    hotels: List[Hotel]
+    age: float
+    cache_status: str
+
+
+def clear_hotels_cache():
+    _hotels_cache.clear()
+
+
+async def _refresh_hotels(key: str, city: str) -> List[Hotel]:
+    hotels = await search_hotels(city)
+    _hotels_cache.set(key, hotels, _get_hotels_ttl_seconds())
+    return hotels
+
+
+async def _refresh_hotels_in_background(key: str, city: str):
+    try:
+        await _hotels_flights.do(key, lambda: _refresh_hotels(key, city))
+    except Exception as e:
+        logger.warning(f"Не удалось обновить кэш отелей для '{city}': {e}")
+
+
+async def get_cached_hotels(city: str, date_from: Optional[str] = None, date_to: Optional[str] = None) -> CachedHotels:
+    key = normalize_city(city)
+    entry = _hotels_cache.get_entry(key, allow_expired=True)
+    
+    if entry is not None and not entry.expired:
+        return CachedHotels(hotels=entry.value, age=entry.age, cache_status="HIT")
+    
+    if entry is not None and entry.age < _get_hotels_ttl_seconds() + _get_hotels_max_stale_seconds():
+        task = asyncio.create_task(_refresh_hotels_in_background(key, city))
+        _background_refreshes.add(task)
+        task.add_done_callback(_background_refreshes.discard)
+        return CachedHotels(hotels=entry.value, age=entry.age, cache_status="STALE")
+    
+    hotels = await _hotels_flights.do(key, lambda: _refresh_hotels(key, city))
+    return CachedHotels(hotels=hotels, age=0.0, cache_status="MISS")
+
+
 async def get_route_map(lat_from: float, lon_from: float, lat_to: float, lon_to: float) -> str:
     api_key = _get_api_key()
     if not api_key:
@@ -0,0 +1,157 @@
+import argparse
+import asyncio
+import logging
+import signal
+from app.config import get_config_value
+from app.services.aviaradar import update_flights_data, delete_old_flights, get_update_interval_seconds
+from app.services.geocoding_cache import geocoding_cache
+from app.services.flights_snapshot import sync_flights_snapshot
+from app.services.leader import LeaseElector, is_leader_election_enabled, get_lease_renew_seconds
+
+logger = logging.getLogger(__name__)
+
+CLEANUP_INTERVAL_SECONDS = 3600
+
+
+def is_ingestion_enabled() -> bool:
+    return bool(get_config_value("ingestion.enabled", True))
+
+
+def _get_snapshot_poll_seconds() -> float:
+    return float(get_config_value("ingestion.snapshot_poll_seconds", 10))
+
+
+async def background_updater():
+    logger.info("Фоновая задача обновления рейсов запущена")
+    while True:
+        try:
+            logger.info("Начало обновления данных о рейсах")
+            await update_flights_data()
+            logger.info("Обновление данных о рейсах завершено")
+        except Exception as e:
+            logger.error(f"Ошибка при обновлении данных о рейсах: {e}", exc_info=True)
+        await asyncio.sleep(get_update_interval_seconds())
+
+
+async def background_cleaner():
+    logger.info("Фоновая задача очистки старых рейсов запущена")
+    await asyncio.sleep(60)
+    while True:
+        try:
+            await delete_old_flights()
+            await geocoding_cache.purge_expired()
+        except Exception as e:
+            logger.error(f"Ошибка при очистке старых рейсов: {e}", exc_info=True)
+        await asyncio.sleep(CLEANUP_INTERVAL_SECONDS)
+
+
+def start_background_tasks() -> list:
+    return [asyncio.create_task(background_updater()), asyncio.create_task(background_cleaner())]
+
+
+async def stop_background_tasks(tasks: list):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _sync_snapshot():
+    try:
+        if await sync_flights_snapshot():
+            logger.info("Снимок рейсов обновлен после записи другого процесса")
+    except Exception as e:
+        logger.error(f"Ошибка при синхронизации снимка рейсов: {e}", exc_info=True)
+
+
+async def background_coordinator(sync_snapshot: bool = True):
+    elector = LeaseElector("ingestion")
+    tasks = []
+    try:
+        while True:
+            if await elector.try_acquire():
+                if not tasks:
+                    logger.info("Процесс выбран лидером, запускаются обновление и очистка рейсов")
+                    tasks = start_background_tasks()
+            else:
+                if tasks:
+                    logger.warning("Лидерство потеряно, обновление и очистка рейсов остановлены")
+                    await stop_background_tasks(tasks)
+                    tasks = []
+                if sync_snapshot:
+                    await _sync_snapshot()
+            await asyncio.sleep(get_lease_renew_seconds())
+    finally:
+        await stop_background_tasks(tasks)
+        await elector.release()
+
+
+async def snapshot_follower():
+    logger.info("Обновление рейсов в этом процессе отключено, снимок синхронизируется с базой")
+    while True:
+        await asyncio.sleep(_get_snapshot_poll_seconds())
+        await _sync_snapshot()
+
+
+def start_ingestion() -> list:
+    if not is_ingestion_enabled():
+        return [asyncio.create_task(snapshot_follower())]
+    if is_leader_election_enabled():
+        return [asyncio.create_task(background_coordinator())]
+    return start_background_tasks()
+
+
+async def run_once():
+    await update_flights_data()
+    await delete_old_flights()
+    await geocoding_cache.purge_expired()
+
+
+async def run_worker(once: bool = False):
+    from app.db import init_db, init_pool, close_pool
+    from app.clients import init_http_clients, close_http_clients
+    await init_db()
+    await init_pool()
+    await init_http_clients()
+    
+    main_task = asyncio.current_task()
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, main_task.cancel)
+        handles_sigterm = True
+    except NotImplementedError:
+        handles_sigterm = False
+    
+    try:
+        if once:
+            await run_once()
+        elif is_leader_election_enabled():
+            await background_coordinator(sync_snapshot=False)
+        else:
+            tasks = start_background_tasks()
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                await stop_background_tasks(tasks)
+    except asyncio.CancelledError:
+        logger.info("Воркер обновления рейсов остановлен")
+    finally:
+        if handles_sigterm:
+            loop.remove_signal_handler(signal.SIGTERM)
+        await close_http_clients()
+        await close_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Отдельный процесс обновления и очистки рейсов")
+    parser.add_argument("--once", action="store_true", help="Выполнить один цикл обновления и очистки и завершиться")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(run_worker(once=args.once))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import db
+from app.services import aviaradar
+
+
+def make_details(flight_id: str) -> dict:
+    index = int(flight_id.split("-")[-1])
+    return {
+        "id": flight_id,
+        "number": f"SU{index}",
+        "origin_airport": {"iata": "SVO"},
+        "destination_airport": {"iata": "AER"},
+        "first_message_received_at": f"2025-01-15T{index % 24:02d}:00:00Z",
+        "last_message_received_at": f"2025-01-15T{index % 24:02d}:{index % 60:02d}:00Z",
+        "status": {"live": False},
+    }
+
+
+async def run_mode(name: str, use_pool: bool, args) -> None:
+    os.environ["TEST_DB_NAME"] = f"db.bench.{name}.db"
+    config = {
+        "db.journal_mode": "WAL" if use_pool else "DELETE",
+        "db.synchronous": "NORMAL" if use_pool else "FULL",
+        "db.readers": args.readers,
+        "aviaradar.details_concurrency": 50,
+        "aviaradar.cycle_budget_seconds": 3600,
+        "aviaradar.write_batch_size": args.batch_size,
+        "aviaradar.delta_ingestion": False,
+        "flights.snapshot_enabled": False,
+    }
+    feed = [{"flight_id": f"bench-{i}"} for i in range(args.flights)]
+
+    async def stub_feed():
+        return feed
+
+    async def stub_details(flight_id: str):
+        return make_details(flight_id)
+
+    def config_value(key, default=None):
+        return config.get(key, default)
+
+    with patch.object(db, "get_config_value", config_value), \
+            patch.object(aviaradar, "get_config_value", config_value), \
+            patch.object(aviaradar, "fetch_aircrafts_feed", stub_feed), \
+            patch.object(aviaradar, "fetch_flight_details", stub_details):
+        await db.init_db()
+        await aviaradar.update_flights_data()
+        if use_pool:
+            await db.init_pool()
+
+        latencies = []
+        ingestion_done = asyncio.Event()
+
+        async def reader():
+            while not ingestion_done.is_set():
+                started_at = time.perf_counter()
+                await aviaradar.get_flights_from_db("flight", has_delay=True, limit=100)
+                latencies.append(time.perf_counter() - started_at)
+
+        async def ingest():
+            try:
+                for _ in range(args.cycles):
+                    await aviaradar.update_flights_data()
+            finally:
+                ingestion_done.set()
+
+        started_at = time.perf_counter()
+        await asyncio.gather(ingest(), *(reader() for _ in range(args.concurrent_reads)))
+        elapsed = time.perf_counter() - started_at
+
+        if use_pool:
+            await db.close_pool()
+
+    for suffix in ("", "-wal", "-shm"):
+        path = Path(f"{db.get_db_path()}{suffix}")
+        if path.exists():
+            path.unlink()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    print(
+        f"{name:>10} {elapsed:>10.2f} {len(latencies):>8} {len(latencies) / elapsed:>10.0f} "
+        f"{statistics.median(latencies) * 1000:>9.2f} {p95 * 1000:>9.2f} {latencies[-1] * 1000:>9.2f}"
+    )
+
+
+async def main(args):
+    print(f"Рейсов: {args.flights}, циклов записи: {args.cycles}, параллельных читателей: {args.concurrent_reads}")
+    print(f"{'режим':>10} {'время, с':>10} {'чтений':>8} {'чтений/с':>10} {'p50, мс':>9} {'p95, мс':>9} {'max, мс':>9}")
+    await run_mode("legacy", False, args)
+    await run_mode("pool", True, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Чтения из SQLite во время цикла записи: соединение на запрос против пула с WAL")
+    parser.add_argument("--flights", type=int, default=5000)
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--concurrent-reads", type=int, default=8)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,76 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("TEST_DB_NAME", "db.bench.db")
+
+from app.db import init_db, get_db_path
+from app.services import aviaradar
+
+
+def make_feed(size: int) -> list:
+    return [{"flight_id": f"bench-{i}"} for i in range(size)]
+
+
+def make_details(flight_id: str) -> dict:
+    return {
+        "id": flight_id,
+        "number": f"SU{flight_id.split('-')[-1]}",
+        "origin_airport": {"iata": "SVO", "name": "Шереметьево"},
+        "destination_airport": {"iata": "AER", "name": "Сочи"},
+        "first_message_received_at": "2025-01-15T10:00:00Z",
+        "last_message_received_at": "2025-01-15T10:15:00Z",
+        "status": {"live": False},
+    }
+
+
+async def run_cycle(feed_size: int, latency_ms: float, concurrency: int) -> float:
+    feed = make_feed(feed_size)
+
+    async def stub_feed():
+        return feed
+
+    async def stub_details(flight_id: str):
+        await asyncio.sleep(random.uniform(0.5, 1.5) * latency_ms / 1000)
+        return make_details(flight_id)
+
+    config = {
+        "aviaradar.details_concurrency": concurrency,
+        "aviaradar.cycle_budget_seconds": 3600,
+        "aviaradar.delta_ingestion": False,
+    }
+
+    with patch.object(aviaradar, "fetch_aircrafts_feed", stub_feed), \
+            patch.object(aviaradar, "fetch_flight_details", stub_details), \
+            patch.object(aviaradar, "get_config_value", lambda key, default=None: config.get(key, default)):
+        started_at = time.perf_counter()
+        await aviaradar.update_flights_data()
+        return time.perf_counter() - started_at
+
+
+async def main(args):
+    await init_db()
+    try:
+        print(f"Лента: {args.feed_size} самолетов, задержка деталей ~{args.latency_ms} мс")
+        print(f"{'concurrency':>12} {'cycle, s':>10} {'flights/s':>10}")
+        for concurrency in args.concurrency:
+            elapsed = await run_cycle(args.feed_size, args.latency_ms, concurrency)
+            print(f"{concurrency:>12} {elapsed:>10.2f} {args.feed_size / elapsed:>10.0f}")
+    finally:
+        db_path = get_db_path()
+        if db_path.exists():
+            db_path.unlink()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Время цикла update_flights_data в зависимости от concurrency")
+    parser.add_argument("--feed-size", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10, 20, 50, 100])
+    asyncio.run(main(parser.parse_args()))
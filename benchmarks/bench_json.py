@@ -0,0 +1,93 @@
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.models.flights import Flight, FlightListResponse
+from app.models.twogis import Hotel, HotelListResponse
+from app.models.weather import WeatherResponse, DayWeather
+from app.responses import FastJSONResponse, orjson, _has_non_finite
+from app.routers.widgets import _get_travel_view
+
+
+def make_flights(count: int) -> FlightListResponse:
+    scheduled = datetime(2025, 1, 15, 10, 0)
+    flights = [
+        Flight(
+            flight_id=f"bench-{i}",
+            flight_number=f"SU{i}",
+            origin="SVO",
+            destination="AER",
+            scheduled_time=scheduled + timedelta(minutes=i),
+            actual_time=scheduled + timedelta(minutes=i + 15),
+            status="active" if i % 3 == 0 else "landed",
+            delay_minutes=15,
+            gate=None if i % 2 else f"A{i % 40}"
+        )
+        for i in range(count)
+    ]
+    return FlightListResponse(flights=flights, total=count)
+
+
+def make_hotels(count: int, rating: float = 4.7) -> HotelListResponse:
+    hotels = [
+        Hotel(
+            id=f"7030{i}",
+            name=f"Отель {i}",
+            address="Невский проспект, 57",
+            lat=59.93,
+            lon=30.35,
+            rating=rating if i % 2 else None,
+            phone="+7 812 000-00-00",
+            url=f"https://2gis.ru/firm/7030{i}",
+            photos=[f"https://photo.2gis.com/{i}/{j}.jpg" for j in range(5)]
+        )
+        for i in range(count)
+    ]
+    return HotelListResponse(hotels=hotels, total=count)
+
+
+def make_weather(days: int) -> WeatherResponse:
+    return WeatherResponse(city="Москва", days=[
+        DayWeather(date=f"2025-01-{i + 1:02d}", temperature_max=-3.5, temperature_min=-9.1, temperature_avg=-6.3, condition="Снег")
+        for i in range(days)
+    ])
+
+
+def measure(encode, payload, rounds: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(rounds):
+        encode(payload)
+    return (time.perf_counter() - started_at) / rounds
+
+
+def main(args):
+    flights = make_flights(args.flights)
+    payloads = [
+        (f"flights x{args.flights}", flights),
+        (f"flights dict x{args.flights}", jsonable_encoder(flights)),
+        ("hotels x10", make_hotels(10)),
+        ("hotels dict x10", jsonable_encoder(make_hotels(10))),
+        ("weather x16", make_weather(16)),
+        ("widgets travel", _get_travel_view()),
+    ]
+    print(f"orjson: {orjson.__version__}")
+    print(f"{'ответ':>20} {'размер, КБ':>11} {'jsonable, мс':>13} {'fast, мс':>10} {'проверка NaN, мс':>17} {'ускорение':>10}")
+    for name, payload in payloads:
+        default = measure(lambda model: JSONResponse(jsonable_encoder(model)), payload, args.rounds)
+        fast = measure(FastJSONResponse, payload, args.rounds)
+        scan = measure(_has_non_finite, payload, args.rounds)
+        size = len(FastJSONResponse(payload).body) / 1024
+        print(f"{name:>20} {size:>11.1f} {default * 1000:>13.3f} {fast * 1000:>10.3f} {scan * 1000:>17.3f} {default / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сериализация ответов: jsonable_encoder + JSONResponse против FastJSONResponse")
+    parser.add_argument("--flights", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=200)
+    main(parser.parse_args())
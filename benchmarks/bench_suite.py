@@ -0,0 +1,273 @@
+import argparse
+import asyncio
+import json
+import platform
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("TEST_DB_NAME", "db.bench.db")
+
+from app import config
+from app.clients import init_http_clients, close_http_clients
+from app.db import init_db, init_pool, close_pool, get_db_path
+from app.responses import orjson
+from app.services import aviaradar
+from main import app
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+API_TOKEN = "bench-token"
+
+
+class StubUpstreams:
+    def __init__(self, args):
+        self.latency = args.latency_ms / 1000
+        self.jitter = args.jitter
+        self.feed_size = args.feed_size
+        self.hotels = args.hotels
+        self.completion_chars = args.completion_chars
+        self.calls = {}
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        path = request.url.path
+        self.calls[host] = self.calls.get(host, 0) + 1
+        await asyncio.sleep(self.latency * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+        if host.startswith("aviaradar"):
+            if path.endswith("/aircrafts/feed"):
+                return httpx.Response(200, json=self.aircrafts_feed())
+            return httpx.Response(200, json=self.flight_details(path.rsplit("/", 1)[-1]))
+        if host.startswith("geocoding-api.open-meteo"):
+            return httpx.Response(200, json={"results": [{"name": request.url.params.get("name"), "latitude": 59.94, "longitude": 30.31}]})
+        if host.startswith("api.open-meteo"):
+            return httpx.Response(200, json=self.forecast())
+        if host.startswith("catalog.api.2gis"):
+            if path.endswith("/byid"):
+                return httpx.Response(200, json=self.hotel_photos(request.url.params.get("id")))
+            if request.url.params.get("q") == "отели":
+                return httpx.Response(200, json=self.hotels_page())
+            return httpx.Response(200, json={"result": {"items": [{"type": "adm_div", "subtype": "city", "point": {"lat": 59.94, "lon": 30.31}}]}})
+        if host.startswith("openrouter"):
+            return httpx.Response(200, json=self.chat_completion())
+        return httpx.Response(404, json={"error": f"Нет заглушки для {request.url}"})
+
+    def aircrafts_feed(self) -> list:
+        return [{"flight_id": f"bench-{i}", "lat": 55.97, "lon": 37.41, "alt": 10000 + i} for i in range(self.feed_size)]
+
+    def flight_details(self, flight_id: str) -> dict:
+        now = datetime.now(timezone.utc)
+        return {
+            "id": flight_id,
+            "number": f"SU{flight_id.rsplit('-', 1)[-1]}",
+            "origin_airport": {"iata": "SVO", "name": "Шереметьево"},
+            "destination_airport": {"iata": "LED", "name": "Пулково"},
+            "first_message_received_at": (now - timedelta(hours=1)).isoformat(),
+            "last_message_received_at": (now - timedelta(minutes=45)).isoformat(),
+            "status": {"live": False},
+        }
+
+    def forecast(self) -> dict:
+        today = date.today()
+        days = [(today + timedelta(days=i)).isoformat() for i in range(16)]
+        return {"daily": {
+            "time": days,
+            "temperature_2m_max": [5.0 + i for i in range(16)],
+            "temperature_2m_min": [-2.0 + i for i in range(16)],
+            "weathercode": [i % 4 for i in range(16)],
+        }}
+
+    def hotels_page(self) -> dict:
+        return {"result": {"items": [
+            {
+                "id": f"7030{i}",
+                "name": f"Отель {i}",
+                "address_name": f"Невский проспект, {i}",
+                "point": {"lat": 59.93 + i / 1000, "lon": 30.33},
+                "rating": {"rating": 4.5},
+                "contact_groups": [{"type": "phone", "contacts": [{"value": "+7 812 000-00-00"}]}],
+                "flags": {"photos": True},
+            }
+            for i in range(self.hotels)
+        ]}}
+
+    def hotel_photos(self, hotel_id: str) -> dict:
+        return {"result": {"items": [{"id": hotel_id, "photos": [{"url": f"https://photo.2gis.com/{hotel_id}/{i}.jpg"} for i in range(3)]}]}}
+
+    def chat_completion(self) -> dict:
+        return {
+            "id": "gen-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "x-ai/grok-code-fast-1",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "а" * self.completion_chars}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 12, "completion_tokens": self.completion_chars // 4, "total_tokens": 12 + self.completion_chars // 4},
+        }
+
+
+def bench_config(args) -> dict:
+    raw = {
+        "aviaradar": {"details_concurrency": args.details_concurrency, "cycle_budget_seconds": 3600, "delta_ingestion": False},
+        "twogis": {"api_key": "bench"},
+        "openrouter": {"llm_api_key": "bench", "api_token": API_TOKEN},
+        "geocoding": {"persist": not args.cold},
+    }
+    if args.cold:
+        raw["openmeteo"] = {"forecast_ttl_seconds": 0}
+        raw["twogis"].update({"hotels_ttl_seconds": 0, "hotels_max_stale_seconds": 0, "photos_ttl_seconds": 0})
+        raw["geocoding"]["ttl_seconds"] = 0
+    return raw
+
+
+def scenarios() -> dict:
+    date_from = (date.today() + timedelta(days=1)).isoformat()
+    date_to = (date.today() + timedelta(days=5)).isoformat()
+    return {
+        "flights": ("GET", "/flights", {"params": {"limit": 100}}),
+        "weather": ("GET", "/weather", {"params": {"city": "Санкт-Петербург", "date_from": date_from, "date_to": date_to}}),
+        "twogis_hotels": ("GET", "/twogis/hotels", {"params": {"city": "Санкт-Петербург"}}),
+        "widgets_view": ("GET", "/widgets/view", {"params": {"goal_id": "bench", "context": "travel"}}),
+        "widgets_view_live": ("GET", "/widgets/view", {"params": {"goal_id": "bench", "context": "travel", "live": "true"}}),
+        "openrouter_chat": ("POST", "/openrouter/chat/completions", {
+            "headers": {"X-API-Token": API_TOKEN},
+            "json": {"model": "x-ai/grok-code-fast-1", "messages": [{"role": "user", "content": "Привет"}]},
+        }),
+    }
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies, default=0.0) * 1000, 2),
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, method: str, url: str, kwargs: dict, requests: int, concurrency: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        await client.request(method, url, **kwargs)
+
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started_at = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started_at)
+            if response.status_code >= 400:
+                errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started_at)
+
+
+async def run_ingestion(cycles: int) -> dict:
+    durations = []
+    for _ in range(cycles):
+        started_at = time.perf_counter()
+        await aviaradar.update_flights_data()
+        durations.append(time.perf_counter() - started_at)
+    count = await aviaradar.count_flights_in_db("flight")
+    best = min(durations)
+    return {
+        "cycles": cycles,
+        "flights": count,
+        "cycle_s": [round(value, 3) for value in durations],
+        "flights_per_s": round(count / best, 1) if best else 0.0,
+    }
+
+
+async def main(args):
+    stubs = StubUpstreams(args)
+    selected = args.scenarios or list(scenarios())
+
+    config.set_settings(config.Settings.from_dict(bench_config(args)))
+    await init_db()
+    await init_pool()
+    await init_http_clients(httpx.MockTransport(stubs.handle))
+    try:
+        results = {"update_flights_data": await run_ingestion(args.ingestion_cycles)}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in selected:
+                method, url, kwargs = scenarios()[name]
+                results[name] = await run_scenario(client, method, url, kwargs, args.requests, args.concurrency, args.warmup)
+    finally:
+        await close_http_clients()
+        await close_pool()
+        config.set_settings(None)
+        db_path = get_db_path()
+        for path in (db_path, db_path.with_name(db_path.name + "-wal"), db_path.with_name(db_path.name + "-shm")):
+            if path.exists():
+                path.unlink()
+
+    report = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "orjson": orjson.__version__,
+        "args": vars(args),
+        "upstream_calls": stubs.calls,
+        "results": results,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    ingestion = results["update_flights_data"]
+    print(f"update_flights_data: {ingestion['flights']} рейсов, {ingestion['flights_per_s']} рейсов/с")
+    print(f"{'scenario':>20} {'rps':>8} {'p50, ms':>9} {'p95, ms':>9} {'p99, ms':>9} {'errors':>7}")
+    for name in selected:
+        row = results[name]
+        print(f"{name:>20} {row['throughput_rps']:>8} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} {row['errors']:>7}")
+    print(f"Результаты записаны в {output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+        print(f"\nСравнение с {args.baseline} (p95, мс):")
+        for name in selected:
+            if name in baseline:
+                before, after = baseline[name]["p95_ms"], results[name]["p95_ms"]
+                change = (after - before) / before * 100 if before else 0.0
+                print(f"{name:>20} {before:>9} -> {after:>9} ({change:+.1f}%)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон API на заглушках внешних сервисов")
+    parser.add_argument("--scenarios", nargs="+", choices=list(scenarios()), help="По умолчанию все сценарии")
+    parser.add_argument("--requests", type=int, default=500, help="Запросов на сценарий")
+    parser.add_argument("--concurrency", type=int, default=20, help="Параллельных клиентов")
+    parser.add_argument("--warmup", type=int, default=5, help="Прогревочных запросов на сценарий")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Задержка ответа заглушек")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Разброс задержки, доля от --latency-ms")
+    parser.add_argument("--feed-size", type=int, default=2000, help="Самолетов в ленте aviaradar")
+    parser.add_argument("--details-concurrency", type=int, default=20)
+    parser.add_argument("--ingestion-cycles", type=int, default=1)
+    parser.add_argument("--hotels", type=int, default=10, help="Отелей в ответе 2GIS")
+    parser.add_argument("--completion-chars", type=int, default=2000, help="Размер ответа OpenRouter")
+    parser.add_argument("--cold", action="store_true", help="Отключить кэши погоды, отелей и геокодинга")
+    parser.add_argument("--output", help=f"Файл результатов (по умолчанию {RESULTS_DIR}/bench-<время>.json)")
+    parser.add_argument("--baseline", help="Файл результатов предыдущего прогона для сравнения")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("TEST_DB_NAME", "db.bench.db")
+
+from app.db import init_db, get_db_path, get_db_connection
+from app.services.aviaradar import parse_flight_row, save_flights_batch
+
+LEGACY_INSERT_SQL = """
+    INSERT OR REPLACE INTO flights
+    (flight_id, flight_number, destination, origin, scheduled_time, actual_time,
+     status, gate, terminal, delay_minutes, flight_type, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def make_rows(count: int) -> list:
+    rows = []
+    for i in range(count):
+        row = parse_flight_row({
+            "id": f"bench-{i}",
+            "number": f"SU{i}",
+            "origin_airport": {"iata": "SVO"},
+            "destination_airport": {"iata": "AER"},
+            "first_message_received_at": "2025-01-15T10:00:00Z",
+            "last_message_received_at": "2025-01-15T10:15:00Z",
+            "status": {"live": i % 3 == 0},
+        }, "flight")
+        rows.append(row)
+    return rows
+
+
+async def legacy_path(rows: list):
+    conn = await get_db_connection()
+    try:
+        for saved_count, row in enumerate(rows, start=1):
+            await conn.execute(LEGACY_INSERT_SQL, row)
+            if saved_count % 10 == 0:
+                await conn.commit()
+        await conn.commit()
+    finally:
+        await conn.close()
+
+
+async def batch_path(rows: list, batch_size: int):
+    conn = await get_db_connection()
+    try:
+        await save_flights_batch(conn, rows, batch_size)
+    finally:
+        await conn.close()
+
+
+async def measure(name: str, rows: list, writer) -> None:
+    conn = await get_db_connection()
+    await conn.execute("DELETE FROM flights")
+    await conn.commit()
+    await conn.close()
+
+    for label in ("вставка", "обновление"):
+        started_at = time.perf_counter()
+        await writer(rows)
+        elapsed = time.perf_counter() - started_at
+        print(f"{name:>28} {label:>12} {elapsed:>10.3f} {len(rows) / elapsed:>12.0f}")
+
+
+async def main(args):
+    await init_db()
+    try:
+        rows = make_rows(args.rows)
+        print(f"{'путь':>28} {'операция':>12} {'время, с':>10} {'строк/с':>12}")
+        await measure("INSERT OR REPLACE / 10", rows, legacy_path)
+        await measure(f"UPSERT executemany / {args.batch_size}", rows, lambda r: batch_path(r, args.batch_size))
+    finally:
+        db_path = get_db_path()
+        if db_path.exists():
+            db_path.unlink()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Скорость записи рейсов: построчная запись против пакетного UPSERT")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    asyncio.run(main(parser.parse_args()))
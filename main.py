@@ -1,63 +1,48 @@
 from fastapi import FastAPI
-import asyncio
 import logging
 from contextlib import asynccontextmanager
-from app.services.aviaradar import update_flights_data, delete_old_flights
-from app.routers import flights, weather, twogis, widgets, openrouter
+from app.worker import start_ingestion, stop_background_tasks
+from app.metrics import MetricsMiddleware
+from app.responses import FastJSONResponse
+from app.routers import flights, weather, twogis, widgets, openrouter, metrics
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-UPDATE_INTERVAL_SECONDS = 120
-CLEANUP_INTERVAL_SECONDS = 3600
-
-
-async def background_updater():
-    logger.info("Фоновая задача обновления рейсов запущена")
-    while True:
-        try:
-            logger.info("Начало обновления данных о рейсах")
-            await update_flights_data()
-            logger.info("Обновление данных о рейсах завершено")
-        except Exception as e:
-            logger.error(f"Ошибка при обновлении данных о рейсах: {e}", exc_info=True)
-        await asyncio.sleep(UPDATE_INTERVAL_SECONDS)
-
-
-async def background_cleaner():
-    logger.info("Фоновая задача очистки старых рейсов запущена")
-    await asyncio.sleep(60)
-    while True:
-        try:
-            await delete_old_flights()
-        except Exception as e:
-            logger.error(f"Ошибка при очистке старых рейсов: {e}", exc_info=True)
-        await asyncio.sleep(CLEANUP_INTERVAL_SECONDS)
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    from app.db import init_db
+    from app.db import init_db, init_pool, close_pool
+    from app.clients import init_http_clients, close_http_clients
+    from app.services.flights_snapshot import rebuild_flights_snapshot, is_snapshot_enabled
     await init_db()
-    updater_task = asyncio.create_task(background_updater())
-    cleaner_task = asyncio.create_task(background_cleaner())
+    await init_pool()
+    await init_http_clients()
+    if is_snapshot_enabled():
+        await rebuild_flights_snapshot()
+    tasks = start_ingestion()
     yield
-    updater_task.cancel()
-    cleaner_task.cancel()
+    await stop_background_tasks(tasks)
+    await close_http_clients()
+    await close_pool()
 
 
 app = FastAPI(
     title="MCP-like REST API",
     version="2.0.0",
     description="REST API сервер с различными функциями для получения информации",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(flights.router)
 app.include_router(weather.router)
 app.include_router(twogis.router)
 app.include_router(widgets.router)
 app.include_router(openrouter.router)
+app.include_router(metrics.router)
 
 
 @app.get("/")
@@ -75,9 +60,12 @@ async def root():
                         "description": "Получить все рейсы",
                         "query_params": {
                             "flight_number": "Опционально. Фильтр по номеру рейса (например: SU123)",
-                            "has_delay": "Опционально. Фильтр по наличию задержки (true/false)"
+                            "has_delay": "Опционально. Фильтр по наличию задержки (true/false)",
+                            "limit": "Опционально. Размер страницы (1-1000)",
+                            "cursor": "Опционально. Курсор следующей страницы (next_cursor из предыдущего ответа)",
+                            "include_total": "Опционально. Считать общее количество рейсов (по умолчанию true)"
                         },
-                        "example": "GET /flights?flight_number=SU&has_delay=true"
+                        "example": "GET /flights?flight_number=SU&has_delay=true&limit=100"
                     },
                     "GET /flights/all": {
                         "description": "Получить все рейсы (аналогично /flights)",
@@ -94,6 +82,10 @@ async def root():
                     "POST /flights/update": {
                         "description": "Запустить обновление данных о рейсах",
                         "example": "POST /flights/update"
+                    },
+                    "GET /flights/ingestion/stats": {
+                        "description": "Трассировка последних циклов обновления: время этапов, перцентили запросов деталей, причины пропусков, превышения интервала",
+                        "example": "GET /flights/ingestion/stats"
                     }
                 }
             },
@@ -16,6 +16,30 @@ def setup_db():
     if os.path.exists(test_db_path):
         os.remove(test_db_path)
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    from app.services.geocoding_cache import geocoding_cache
+    from app.services.openmeteo import clear_forecast_cache
+    from app.services.twogis import clear_photos_cache, clear_hotels_cache
+    from app.services.openrouter import clear_response_cache
+    from app.services.llm_limiter import model_limiters
+    from app.routers.widgets import clear_widgets_cache
+    from app.services.travel_view import clear_travel_view_cache
+    from app.metrics import reset_metrics
+    from app.services.ingestion_trace import clear_ingestion_traces
+    asyncio.run(geocoding_cache.clear())
+    clear_forecast_cache()
+    clear_photos_cache()
+    clear_hotels_cache()
+    clear_response_cache()
+    model_limiters.clear()
+    clear_widgets_cache()
+    clear_travel_view_cache()
+    reset_metrics()
+    asyncio.run(clear_ingestion_traces())
+    yield
+
+
 @pytest.fixture
 def client():
     return TestClient(app)
@@ -0,0 +1,80 @@
+import pytest
+import httpx
+from unittest.mock import patch
+from app.clients import http_client, init_http_clients, close_http_clients, _clients
+from app.config import Settings, set_settings
+
+
+@pytest.mark.asyncio
+async def test_http_client_reuses_pooled_client():
+    await init_http_clients()
+    try:
+        async with http_client("openmeteo") as first:
+            pass
+        async with http_client("openmeteo") as second:
+            pass
+        assert first is second
+        assert not first.is_closed
+    finally:
+        await close_http_clients()
+    
+    assert first.is_closed
+    assert _clients == {}
+
+
+@pytest.mark.asyncio
+async def test_http_client_without_registry_uses_temporary_client():
+    async with http_client("twogis") as client:
+        assert not client.is_closed
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_http_client_applies_config_limits():
+    config = {
+        "http.twogis.timeout": 5,
+        "http.twogis.max_connections": 7,
+    }
+    with patch("app.clients.get_config_value", lambda key, default=None: config.get(key, default)):
+        async with http_client("twogis") as client:
+            assert client.timeout.read == 5
+            assert client._transport._pool._max_connections == 7
+
+
+@pytest.mark.asyncio
+async def test_http_client_unknown_upstream():
+    with pytest.raises(ValueError, match="Unknown upstream"):
+        async with http_client("unknown"):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_init_http_clients_uses_given_transport():
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"host": request.url.host}))
+    await init_http_clients(transport)
+    try:
+        async with http_client("openmeteo") as client:
+            response = await client.get("https://api.open-meteo.com/v1/forecast")
+        assert response.json() == {"host": "api.open-meteo.com"}
+    finally:
+        await close_http_clients()
+
+
+@pytest.mark.asyncio
+async def test_http_clients_are_rebuilt_when_settings_change():
+    await init_http_clients()
+    try:
+        async with http_client("twogis") as old_twogis:
+            async with http_client("openmeteo") as old_openmeteo:
+                pass
+            set_settings(Settings.from_dict({"http": {"twogis": {"max_connections": 3}}}))
+            async with http_client("twogis") as new_twogis:
+                assert new_twogis._transport._pool._max_connections == 3
+            async with http_client("openmeteo") as openmeteo:
+                assert openmeteo is old_openmeteo
+            assert new_twogis is not old_twogis
+            assert not old_twogis.is_closed
+        assert old_twogis.is_closed
+    finally:
+        set_settings(None)
+        await close_http_clients()
@@ -3,7 +3,7 @@ import tempfile
 import pytest
 from pathlib import Path
 from unittest.mock import patch
-from app.config import load_config, get_config_value, CONFIG_PATH, _config
+from app.config import load_config, get_config_value, CONFIG_PATH
 
 
 def test_load_config_with_existing_file():
@@ -22,19 +22,17 @@ def test_load_config_with_existing_file():
     
     try:
         with patch('app.config.CONFIG_PATH', temp_path):
-            with patch('app.config._config', {}):
-                config = load_config()
-                assert config == test_config
-                assert config["gismeteo"]["api_token"] == "test_token_123"
+            config = load_config()
+            assert config == test_config
+            assert config["gismeteo"]["api_token"] == "test_token_123"
     finally:
         temp_path.unlink()
 
 
 def test_load_config_without_file():
     with patch('app.config.CONFIG_PATH', Path("/nonexistent/config.json")):
-        with patch('app.config._config', {}):
-            config = load_config()
-            assert config == {}
+        config = load_config()
+        assert config == {}
 
 
 def test_get_config_value_existing_key():
@@ -50,9 +48,8 @@ def test_get_config_value_existing_key():
     
     try:
         with patch('app.config.CONFIG_PATH', temp_path):
-            with patch('app.config._config', {}):
-                value = get_config_value("gismeteo.api_token")
-                assert value == "test_token_123"
+            value = get_config_value("gismeteo.api_token")
+            assert value == "test_token_123"
     finally:
         temp_path.unlink()
 
@@ -72,9 +69,8 @@ def test_get_config_value_nested_key():
     
     try:
         with patch('app.config.CONFIG_PATH', temp_path):
-            with patch('app.config._config', {}):
-                value = get_config_value("level1.level2.level3")
-                assert value == "deep_value"
+            value = get_config_value("level1.level2.level3")
+            assert value == "deep_value"
     finally:
         temp_path.unlink()
 
@@ -88,9 +84,8 @@ def test_get_config_value_with_default():
     
     try:
         with patch('app.config.CONFIG_PATH', temp_path):
-            with patch('app.config._config', {}):
-                value = get_config_value("nonexistent.key", "default_value")
-                assert value == "default_value"
+            value = get_config_value("nonexistent.key", "default_value")
+            assert value == "default_value"
     finally:
         temp_path.unlink()
 
@@ -106,9 +101,8 @@ def test_get_config_value_nonexistent_key():
     
     try:
         with patch('app.config.CONFIG_PATH', temp_path):
-            with patch('app.config._config', {}):
-                value = get_config_value("nonexistent.key")
-                assert value is None
+            value = get_config_value("nonexistent.key")
+            assert value is None
     finally:
         temp_path.unlink()
 
@@ -126,9 +120,75 @@ def test_get_config_value_partial_path():
     
     try:
         with patch('app.config.CONFIG_PATH', temp_path):
-            with patch('app.config._config', {}):
-                value = get_config_value("gismeteo.nonexistent", "default")
-                assert value == "default"
+            value = get_config_value("gismeteo.nonexistent", "default")
+            assert value == "default"
+    finally:
+        temp_path.unlink()
+
+
+
+def test_settings_reload_when_file_changes():
+    import os
+    from app import config
+    
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+        json.dump({"openrouter": {"llm_api_key": "old-key"}, "db": {"readers": 4}}, f)
+        temp_path = Path(f.name)
+    
+    try:
+        with patch('app.config.CONFIG_PATH', temp_path), \
+                patch('app.config.RELOAD_CHECK_INTERVAL_SECONDS', 0):
+            settings = config.get_settings()
+            assert settings.openrouter.llm_api_key == "old-key"
+            assert settings.openrouter.llm_model == "x-ai/grok-code-fast-1"
+            assert config.get_config_value("db.readers") == 4
+            
+            temp_path.write_text(json.dumps({"openrouter": {"llm_api_key": "new-key"}}), encoding="utf-8")
+            os.utime(temp_path, ns=(settings.mtime + 10 ** 9, settings.mtime + 10 ** 9))
+            
+            assert config.get_settings().openrouter.llm_api_key == "new-key"
+            assert config.get_config_value("db.readers", 8) == 8
+            
+            temp_path.write_text("{broken", encoding="utf-8")
+            os.utime(temp_path, ns=(settings.mtime + 2 * 10 ** 9, settings.mtime + 2 * 10 ** 9))
+            
+            assert config.get_settings().openrouter.llm_api_key == "new-key"
     finally:
         temp_path.unlink()
 
+
+def test_set_settings_overrides_file_and_bumps_version():
+    from app import config
+    
+    version = config.get_settings_version()
+    config.set_settings(config.Settings.from_dict({"db": {"readers": 2}}))
+    try:
+        assert config.get_config_value("db.readers") == 2
+        assert config.get_settings_version() == version + 1
+    finally:
+        config.set_settings(None)
+    
+    assert config.get_config_value("db.readers", "default") != 2
+
+
+def test_ttl_caches_follow_settings_changes():
+    from app import config
+    from app.services.openmeteo import _forecast_cache
+    
+    _forecast_cache.clear()
+    config.set_settings(config.Settings.from_dict({"openmeteo": {"forecast_cache_size": 3, "forecast_ttl_seconds": 60}}))
+    try:
+        for i in range(3):
+            _forecast_cache.set(i, i)
+        assert (_forecast_cache.maxsize, _forecast_cache.ttl) == (3, 60.0)
+        
+        config.set_settings(config.Settings.from_dict({"openmeteo": {"forecast_cache_size": 1}}))
+        assert _forecast_cache.get_entry(2).value == 2
+        assert len(_forecast_cache) == 1
+        assert _forecast_cache.ttl == 3600.0
+    finally:
+        config.set_settings(None)
+        _forecast_cache.clear()
+    
+    assert _forecast_cache.get_entry(2) is None
+    assert _forecast_cache.maxsize == int(config.get_config_value("openmeteo.forecast_cache_size", 1000))
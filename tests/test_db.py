@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+from app import db
+from app.config import Settings, set_settings
+from app.db import init_pool, close_pool, reader_connection, writer_connection
+
+
+@pytest.mark.asyncio
+async def test_pool_uses_wal_and_reuses_connections():
+    await init_pool()
+    try:
+        async with reader_connection() as first:
+            cursor = await first.execute("PRAGMA journal_mode")
+            assert (await cursor.fetchone())[0] == "wal"
+        async with writer_connection() as writer:
+            cursor = await writer.execute("PRAGMA synchronous")
+            assert (await cursor.fetchone())[0] == 1
+            cursor = await writer.execute("PRAGMA busy_timeout")
+            assert (await cursor.fetchone())[0] == 5000
+        async with writer_connection() as writer_again:
+            assert writer_again is writer
+    finally:
+        await close_pool()
+
+
+@pytest.mark.asyncio
+async def test_pool_readers_are_read_only():
+    await init_pool()
+    try:
+        async with reader_connection() as conn:
+            with pytest.raises(Exception, match="readonly"):
+                await conn.execute("DELETE FROM flights")
+    finally:
+        await close_pool()
+
+
+@pytest.mark.asyncio
+async def test_pool_serializes_writers_and_rolls_back_on_error():
+    await init_pool()
+    try:
+        order = []
+        
+        async def write(name):
+            async with writer_connection():
+                order.append(f"{name}-start")
+                await asyncio.sleep(0.01)
+                order.append(f"{name}-end")
+        
+        await asyncio.gather(write("a"), write("b"))
+        assert order == ["a-start", "a-end", "b-start", "b-end"]
+        
+        with pytest.raises(RuntimeError):
+            async with writer_connection() as conn:
+                await conn.execute(
+                    "INSERT INTO flights (flight_id, flight_number, status, flight_type, updated_at) VALUES ('pool-rollback', 'X1', 'live', 'flight', '2099-01-01')"
+                )
+                raise RuntimeError("boom")
+        
+        async with reader_connection() as conn:
+            cursor = await conn.execute("SELECT COUNT(*) FROM flights WHERE flight_id = 'pool-rollback'")
+            assert (await cursor.fetchone())[0] == 0
+    finally:
+        await close_pool()
+
+
+@pytest.mark.asyncio
+async def test_pool_is_rebuilt_when_settings_change():
+    await init_pool()
+    try:
+        old_pool = db._pool
+        async with reader_connection() as old_reader:
+            set_settings(Settings.from_dict({"db": {"readers": 2, "busy_timeout": 1000}}))
+            async with writer_connection() as writer:
+                cursor = await writer.execute("PRAGMA busy_timeout")
+                assert (await cursor.fetchone())[0] == 1000
+            assert db._pool is not old_pool
+            assert len(db._pool.readers) == 2
+            cursor = await old_reader.execute("SELECT 1")
+            assert (await cursor.fetchone())[0] == 1
+        await asyncio.gather(*db._draining_pools)
+        assert old_pool.idle_readers.qsize() == 0
+    finally:
+        set_settings(None)
+        await close_pool()
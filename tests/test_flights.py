@@ -92,3 +92,389 @@ def test_flight_response_structure():
         assert "origin" in flight
         assert isinstance(flight["flight_number"], str)
 
+
+
+@pytest.mark.asyncio
+async def test_fetch_flights_details_respects_concurrency():
+    import asyncio
+    from app.services import aviaradar
+    
+    in_flight = 0
+    max_in_flight = 0
+    
+    async def fake_details(flight_id):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if flight_id == "missing":
+            return None
+        if flight_id == "broken":
+            raise RuntimeError("upstream error")
+        return {"id": flight_id}
+    
+    flight_ids = [f"f{i}" for i in range(20)] + ["missing", "broken"]
+    with patch.object(aviaradar, "fetch_flight_details", fake_details):
+        results, errors, not_fetched = await aviaradar.fetch_flights_details_concurrently(flight_ids, 4, 10)
+    
+    assert max_in_flight == 4
+    assert len(results) == 21
+    assert dict(results)["missing"] is None
+    assert errors == 1
+    assert not_fetched == 0
+
+
+@pytest.mark.asyncio
+async def test_fetch_flights_details_stops_at_budget():
+    import asyncio
+    from app.services import aviaradar
+    
+    async def slow_details(flight_id):
+        await asyncio.sleep(0.05)
+        return {"id": flight_id}
+    
+    flight_ids = [f"f{i}" for i in range(20)]
+    with patch.object(aviaradar, "fetch_flight_details", slow_details):
+        results, errors, not_fetched = await aviaradar.fetch_flights_details_concurrently(flight_ids, 2, 0.12)
+    
+    assert 0 < len(results) < 20
+    assert errors == 0
+    assert len(results) + not_fetched == 20
+
+
+@pytest.mark.asyncio
+async def test_update_flights_data_refetches_only_changed_entries():
+    from app.services import aviaradar
+    
+    feed = [
+        {"flight_id": "delta-completed", "lat": 55.0},
+        {"flight_id": "delta-live", "lat": 56.0},
+        {"flight_id": "delta-changed", "lat": 57.0},
+    ]
+    requested = []
+    
+    async def fake_feed():
+        return feed
+    
+    async def fake_details(flight_id):
+        requested.append(flight_id)
+        return {
+            "id": flight_id,
+            "number": flight_id.upper(),
+            "origin_airport": {"iata": "SVO"},
+            "destination_airport": {"iata": "AER"},
+            "status": {"live": flight_id == "delta-live"},
+        }
+    
+    with patch.object(aviaradar, "fetch_aircrafts_feed", fake_feed), \
+            patch.object(aviaradar, "fetch_flight_details", fake_details):
+        await aviaradar.update_flights_data()
+        assert sorted(requested) == ["delta-changed", "delta-completed", "delta-live"]
+        
+        requested.clear()
+        feed[2] = {"flight_id": "delta-changed", "lat": 58.0}
+        await aviaradar.update_flights_data()
+        assert sorted(requested) == ["delta-changed", "delta-live"]
+
+
+@pytest.mark.asyncio
+async def test_update_flights_data_records_cycle_trace(client):
+    from app.services import aviaradar
+    
+    feed = [{"flight_id": "trace-1"}, {"flight_id": "trace-2"}, {"flight_id": "trace-3"}, {"flight_id": "trace-4"}, {"lat": 55.0}]
+    
+    async def fake_feed():
+        return feed
+    
+    async def fake_details(flight_id):
+        if flight_id == "trace-3":
+            return None
+        return {
+            "id": flight_id,
+            "number": "" if flight_id == "trace-4" else flight_id.upper(),
+            "origin_airport": {"iata": "SVO"},
+            "destination_airport": {"iata": "AER"},
+            "status": {"live": True},
+        }
+    
+    with patch.object(aviaradar, "fetch_aircrafts_feed", fake_feed), \
+            patch.object(aviaradar, "fetch_flight_details", fake_details):
+        await aviaradar.update_flights_data()
+    
+    response = client.get("/flights/ingestion/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["interval_seconds"] == aviaradar.get_update_interval_seconds()
+    assert data["overruns"] == 0
+    cycle = data["cycles"][0]
+    assert cycle["feed_size"] == 5
+    assert cycle["details_requested"] == 4
+    assert cycle["saved"] == 2
+    assert cycle["skipped"] == {"no_flight_id": 1, "no_details": 1, "unparsed": 1}
+    assert cycle["commits"] >= 1
+    assert {"feed", "details", "parse", "write"} <= set(cycle["stages"])
+    assert set(cycle["details_latency_ms"]) == {"p50", "p95", "p99", "max"}
+    assert cycle["error"] is None
+
+
+@pytest.mark.asyncio
+async def test_update_flights_data_records_failed_cycle():
+    from app.services import aviaradar
+    
+    async def broken_feed():
+        raise RuntimeError("feed unavailable")
+    
+    with patch.object(aviaradar, "fetch_aircrafts_feed", broken_feed):
+        await aviaradar.update_flights_data()
+    
+    cycle = (await aviaradar.get_ingestion_cycle_stats()).cycles[0]
+    assert cycle.error == "feed unavailable"
+    assert "feed" in cycle.stages
+
+
+@pytest.mark.asyncio
+async def test_update_flights_data_logs_saved_flights_only_after_write():
+    from app.services import aviaradar
+    
+    async def fake_feed():
+        return [{"flight_id": "log-1"}]
+    
+    async def fake_details(flight_id):
+        return {"id": flight_id, "number": "SU 1", "origin_airport": {"iata": "SVO"}, "destination_airport": {"iata": "AER"}}
+    
+    async def broken_write(conn, rows, batch_size):
+        raise RuntimeError("database is locked")
+    
+    with patch.object(aviaradar, "fetch_aircrafts_feed", fake_feed), \
+            patch.object(aviaradar, "fetch_flight_details", fake_details), \
+            patch.object(aviaradar, "save_flights_batch", broken_write), \
+            patch.object(aviaradar.logger, "info") as log_info:
+        await aviaradar.update_flights_data()
+    
+    assert not any("Сохранен рейс" in call.args[0] for call in log_info.call_args_list)
+    cycle = (await aviaradar.get_ingestion_cycle_stats()).cycles[0]
+    assert cycle.error == "database is locked"
+
+
+@pytest.mark.asyncio
+async def test_ingestion_stats_are_served_from_the_database(client):
+    from datetime import datetime, timezone
+    from app.models.flights import IngestionCycle
+    from app.services import ingestion_trace
+    
+    for saved in (1, 2, 3):
+        await ingestion_trace.save_cycle(IngestionCycle(
+            started_at=datetime(2025, 1, 1, 0, saved, tzinfo=timezone.utc),
+            duration_seconds=float(saved),
+            overrun=False,
+            stages={"feed": 0.1},
+            saved=saved,
+            skipped={"no_details": 1}
+        ))
+    
+    with patch.object(ingestion_trace, "_get_history_size", return_value=2):
+        await ingestion_trace.save_cycle(IngestionCycle(
+            started_at=datetime(2025, 1, 1, 0, 4, tzinfo=timezone.utc), duration_seconds=4.0, overrun=True, stages={}, saved=4
+        ))
+        data = client.get("/flights/ingestion/stats").json()
+    
+    assert [cycle["saved"] for cycle in data["cycles"]] == [4, 3]
+    assert data["overruns"] == 1
+    
+    metrics = client.get("/metrics").text
+    assert "ingestion_last_cycle_duration_seconds 4" in metrics
+    assert 'ingestion_last_cycle_rows{result="saved"} 4' in metrics
+    assert 'result="no_details"' not in metrics
+
+
+@pytest.mark.asyncio
+async def test_save_flights_batch_updates_rows_in_place():
+    from app.db import get_db_connection
+    from app.services.aviaradar import parse_flight_row, save_flights_batch
+    
+    def details(flight_id, live):
+        return {
+            "id": flight_id,
+            "number": "SU100",
+            "origin_airport": {"iata": "SVO"},
+            "destination_airport": {"iata": "AER"},
+            "status": {"live": live},
+        }
+    
+    conn = await get_db_connection()
+    try:
+        rows = [parse_flight_row(details(f"batch-{i}", True), "flight") for i in range(5)]
+        commits = await save_flights_batch(conn, rows, 2)
+        assert commits == 3
+        
+        cursor = await conn.execute("SELECT rowid FROM flights WHERE flight_id = 'batch-0'")
+        rowid_before = (await cursor.fetchone())[0]
+        
+        await save_flights_batch(conn, [parse_flight_row(details("batch-0", False), "flight")], 2)
+        cursor = await conn.execute("SELECT rowid, status FROM flights WHERE flight_id = 'batch-0'")
+        rowid_after, status = await cursor.fetchone()
+        
+        assert rowid_after == rowid_before
+        assert status == "completed"
+    finally:
+        await conn.close()
+
+
+def test_flight_snapshot_select_uses_indexes():
+    from app.services.flights_snapshot import build_snapshot
+    
+    rows = [
+        ("s1", "SU100", "AER", "SVO", "2025-01-15T08:00:00+00:00", None, "live", None, None, None, "flight"),
+        ("s2", "SU200", "LED", "SVO", "2025-01-15T09:00:00+00:00", None, "completed", None, None, 15, "flight"),
+        ("s3", "DP300", "AER", "VKO", "2025-01-15T10:00:00+00:00", None, "completed", None, None, 0, "flight"),
+        ("s4", "DP400", "AER", "VKO", "2025-01-15T11:00:00+00:00", None, "completed", None, None, 5, "other"),
+    ]
+    snapshot = build_snapshot(rows)
+    
+    assert [f.flight_id for f in snapshot.select("flight")] == ["s1", "s2", "s3"]
+    assert [f.flight_id for f in snapshot.select("flight", has_delay=True)] == ["s2"]
+    assert [f.flight_id for f in snapshot.select("flight", has_delay=False)] == ["s1", "s3"]
+    assert [f.flight_id for f in snapshot.select("flight", flight_number="su")] == ["s1", "s2"]
+    assert [f.flight_id for f in snapshot.select("flight", flight_number="DP", has_delay=False)] == ["s3"]
+    assert snapshot.select("missing") == []
+
+
+def test_flights_endpoint_served_from_snapshot_without_db():
+    from app.services import flights_snapshot
+    import asyncio
+    
+    asyncio.run(flights_snapshot.rebuild_flights_snapshot())
+    with patch.object(flights_snapshot, "reader_connection", side_effect=AssertionError("DB accessed")):
+        response = client.get("/flights?has_delay=true")
+    
+    assert response.status_code == 200
+    assert response.json()["total"] == len(response.json()["flights"])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("flight_number", [None, "SU"])
+@pytest.mark.parametrize("has_delay", [None, True, False])
+@pytest.mark.parametrize("after", [None, ("2025-01-15T10:00:00+00:00", "abc")])
+async def test_flights_query_plan_uses_index(flight_number, has_delay, after):
+    from app.db import get_db_connection
+    from app.services.aviaradar import build_flights_query
+    
+    query, params = build_flights_query("flight", flight_number, has_delay, 50, after)
+    conn = await get_db_connection()
+    try:
+        cursor = await conn.execute(f"EXPLAIN QUERY PLAN {query}", params)
+        plan = [row[3] for row in await cursor.fetchall()]
+    finally:
+        await conn.close()
+    
+    assert plan
+    for step in plan:
+        assert step.startswith("SEARCH flights USING INDEX"), plan
+        assert "TEMP B-TREE" not in step, plan
+
+
+@pytest.mark.asyncio
+async def test_get_flights_from_db_filters_delay_in_sql():
+    from app.db import get_db_connection
+    from app.services.aviaradar import get_flights_from_db, save_flights_batch
+    
+    rows = [
+        ("sql-1", "ZZ901", None, None, "2025-01-15T10:00:00+00:00", None, "completed", None, None, 30, "flight", "2099-01-01T00:00:00+00:00"),
+        ("sql-2", "ZZ902", None, None, "2025-01-15T09:00:00+00:00", None, "completed", None, None, None, "flight", "2099-01-01T00:00:00+00:00"),
+        ("sql-3", "ZZ903", None, None, "2025-01-15T08:00:00+00:00", None, "completed", None, None, -5, "flight", "2099-01-01T00:00:00+00:00"),
+    ]
+    conn = await get_db_connection()
+    try:
+        await save_flights_batch(conn, rows, 100)
+    finally:
+        await conn.close()
+    
+    delayed = await get_flights_from_db("flight", "ZZ90", True)
+    on_time = await get_flights_from_db("flight", "ZZ90", False)
+    
+    assert [f.flight_id for f in delayed] == ["sql-1"]
+    assert [f.flight_id for f in on_time] == ["sql-3", "sql-2"]
+
+
+
+@pytest.mark.parametrize("snapshot_enabled", [True, False])
+def test_flights_keyset_pagination(snapshot_enabled):
+    import asyncio
+    from app.db import get_db_connection
+    from app.services import aviaradar
+    from app.services.flights_snapshot import rebuild_flights_snapshot
+    
+    async def seed():
+        rows = [
+            (f"page-{i}", f"PG{i:03d}", None, None,
+             None if i < 2 else f"2025-02-01T{i % 3:02d}:00:00+00:00",
+             None, "completed", None, None, None, "flight", "2099-01-01T00:00:00+00:00")
+            for i in range(7)
+        ]
+        conn = await get_db_connection()
+        try:
+            await aviaradar.save_flights_batch(conn, rows, 100)
+        finally:
+            await conn.close()
+        await rebuild_flights_snapshot()
+    
+    asyncio.run(seed())
+    
+    with patch.object(aviaradar, "is_snapshot_enabled", return_value=snapshot_enabled):
+        full = client.get("/flights/all?flight_number=PG").json()
+        assert full["total"] == 7
+        assert full["next_cursor"] is None
+        
+        collected = []
+        cursor = None
+        while True:
+            url = "/flights/all?flight_number=PG&limit=3"
+            if cursor:
+                url += f"&cursor={cursor}"
+            page = client.get(url).json()
+            assert page["total"] == 7
+            assert len(page["flights"]) <= 3
+            collected.extend(f["flight_id"] for f in page["flights"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        
+        assert collected == [f["flight_id"] for f in full["flights"]]
+        
+        no_total = client.get("/flights/all?flight_number=PG&limit=3&include_total=false").json()
+        assert no_total["total"] is None
+        assert len(no_total["flights"]) == 3
+
+
+@pytest.mark.parametrize("snapshot_enabled", [True, False])
+def test_list_flights_to_filters_by_destination(snapshot_enabled):
+    import asyncio
+    from app.db import get_db_connection
+    from app.services import aviaradar
+    from app.services.flights_snapshot import rebuild_flights_snapshot
+    
+    async def run():
+        rows = [
+            ("dest-1", "DS001", "LED", "SVO", "2025-03-01T08:00:00+00:00", None, "scheduled", None, None, None, "flight", "2099-01-01T00:00:00+00:00"),
+            ("dest-2", "DS002", "KZN", "SVO", "2025-03-01T07:00:00+00:00", None, "scheduled", None, None, None, "flight", "2099-01-01T00:00:00+00:00"),
+            ("dest-3", "DS003", "Пулково", "VKO", "2025-03-01T09:00:00+00:00", None, "scheduled", None, None, None, "flight", "2099-01-01T00:00:00+00:00"),
+        ]
+        conn = await get_db_connection()
+        try:
+            await aviaradar.save_flights_batch(conn, rows, 100)
+        finally:
+            await conn.close()
+        await rebuild_flights_snapshot()
+        with patch.object(aviaradar, "is_snapshot_enabled", return_value=snapshot_enabled):
+            return await aviaradar.list_flights_to(["LED", "Пулково"], 10)
+    
+    flights = asyncio.run(run())
+    
+    assert [f.flight_id for f in flights if f.flight_id.startswith("dest-")] == ["dest-1", "dest-3"]
+    assert all(f.destination in ("LED", "Пулково") for f in flights)
+
+
+def test_flights_invalid_cursor():
+    response = client.get("/flights/all?cursor=not-a-cursor")
+    assert response.status_code == 400
@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.metrics import geocoding_cache_lookups
+from app.services.geocoding_cache import GeocodingCache, CityNotFoundError, geocoding_cache, normalize_city
+
+
+def test_normalize_city():
+    assert normalize_city("  Орёл ") == "орел"
+    assert normalize_city("Санкт  Петербург") == "санкт петербург"
+    assert normalize_city("MOSCOW") == "moscow"
+
+
+@pytest.mark.asyncio
+async def test_geocoding_cache_hit_after_miss():
+    fetch = AsyncMock(return_value=(55.75, 37.61))
+    
+    assert await geocoding_cache.get_coordinates("test", "Москва", fetch) == (55.75, 37.61)
+    assert await geocoding_cache.get_coordinates("test", " москва ", fetch) == (55.75, 37.61)
+    
+    assert fetch.await_count == 1
+    stats = geocoding_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert geocoding_cache_lookups.value("test", "memory_hit") == 1
+    assert geocoding_cache_lookups.value("test", "miss") == 1
+
+
+@pytest.mark.asyncio
+async def test_geocoding_cache_caches_not_found():
+    fetch = AsyncMock(side_effect=CityNotFoundError("Город 'Нигде' не найден"))
+    
+    for _ in range(2):
+        with pytest.raises(ValueError, match="не найден"):
+            await geocoding_cache.get_coordinates("test", "Нигде", fetch)
+    
+    assert fetch.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_geocoding_cache_does_not_cache_other_errors():
+    fetch = AsyncMock(side_effect=[ValueError("API key not configured"), (1.0, 2.0)])
+    
+    with pytest.raises(ValueError, match="API key"):
+        await geocoding_cache.get_coordinates("test", "Казань", fetch)
+    assert await geocoding_cache.get_coordinates("test", "Казань", fetch) == (1.0, 2.0)
+
+
+@pytest.mark.asyncio
+async def test_geocoding_cache_survives_restart():
+    fetch = AsyncMock(return_value=(59.93, 30.33))
+    await geocoding_cache.get_coordinates("test", "Санкт-Петербург", fetch)
+    
+    restarted = GeocodingCache()
+    assert await restarted.get_coordinates("test", "санкт-петербург", fetch) == (59.93, 30.33)
+    assert fetch.await_count == 1
+    assert restarted.stats()["persistent_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_geocoding_cache_refetches_expired_entries():
+    fetch = AsyncMock(side_effect=[(1.0, 1.0), (2.0, 2.0)])
+    
+    with patch("app.services.geocoding_cache._get_ttl_seconds", return_value=-1):
+        await geocoding_cache.get_coordinates("test", "Сочи", fetch)
+    
+    assert await geocoding_cache.get_coordinates("test", "Сочи", fetch) == (2.0, 2.0)
+    assert fetch.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_geocoding_cache_tolerates_store_failures():
+    fetch = AsyncMock(return_value=(43.58, 39.72))
+    
+    with patch("app.services.geocoding_cache.writer_connection", side_effect=RuntimeError("database is locked")):
+        assert await geocoding_cache.get_coordinates("test", "Адлер", fetch) == (43.58, 39.72)
+    
+    assert await geocoding_cache.get_coordinates("test", "Адлер", fetch) == (43.58, 39.72)
+    assert fetch.await_count == 1
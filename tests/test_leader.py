@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+from app.db import writer_connection, bump_data_version, get_data_version
+from app.services import flights_snapshot
+from app.services.leader import LeaseElector
+
+
+@pytest.mark.asyncio
+async def test_only_one_holder_gets_the_lease():
+    first = LeaseElector("lease-exclusive", holder="worker-1", ttl_seconds=30)
+    second = LeaseElector("lease-exclusive", holder="worker-2", ttl_seconds=30)
+    
+    assert await first.try_acquire()
+    assert not await second.try_acquire()
+    assert await first.try_acquire()
+    assert first.is_leader
+    assert not second.is_leader
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_fails_over():
+    first = LeaseElector("lease-failover", holder="worker-1", ttl_seconds=0.05)
+    second = LeaseElector("lease-failover", holder="worker-2", ttl_seconds=30)
+    
+    assert await first.try_acquire()
+    await asyncio.sleep(0.1)
+    
+    assert await second.try_acquire()
+    assert not await first.try_acquire()
+
+
+@pytest.mark.asyncio
+async def test_released_lease_is_taken_immediately():
+    first = LeaseElector("lease-release", holder="worker-1", ttl_seconds=30)
+    second = LeaseElector("lease-release", holder="worker-2", ttl_seconds=30)
+    
+    assert await first.try_acquire()
+    await first.release()
+    
+    assert await second.try_acquire()
+
+
+@pytest.mark.asyncio
+async def test_follower_snapshot_follows_data_version():
+    await flights_snapshot.rebuild_flights_snapshot()
+    assert not await flights_snapshot.sync_flights_snapshot()
+    
+    async with writer_connection() as conn:
+        await bump_data_version(conn, flights_snapshot.FLIGHTS_DATA_VERSION)
+        await conn.commit()
+    
+    version = await get_data_version(flights_snapshot.FLIGHTS_DATA_VERSION)
+    assert await flights_snapshot.sync_flights_snapshot()
+    assert flights_snapshot._snapshot_version == version
+    assert not await flights_snapshot.sync_flights_snapshot()
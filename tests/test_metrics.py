@@ -0,0 +1,42 @@
+import pytest
+from app.metrics import Histogram, render_metrics, track_upstream, upstream_errors, upstream_request_duration
+
+
+def test_histogram_exposition_is_cumulative():
+    histogram = Histogram("test_duration_seconds", "Тестовая гистограмма", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5.0, "/a")
+    
+    lines = histogram.samples()
+    
+    assert 'test_duration_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'test_duration_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'test_duration_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'test_duration_seconds_count{route="/a"} 3' in lines
+    assert 'test_duration_seconds_sum{route="/a"} 5.55' in lines
+
+
+def test_track_upstream_counts_errors():
+    with track_upstream("openmeteo", "forecast") as timer:
+        timer.check(200)
+    with track_upstream("openmeteo", "forecast") as timer:
+        timer.check(503)
+    with pytest.raises(RuntimeError):
+        with track_upstream("openmeteo", "forecast"):
+            raise RuntimeError("timeout")
+    
+    assert upstream_request_duration.count("openmeteo", "forecast") == 3
+    assert upstream_errors.value("openmeteo", "forecast") == 2
+
+
+def test_metrics_endpoint_reports_route_templates(client):
+    response = client.get("/widgets/view", params={"goal_id": "123", "context": "travel"})
+    assert response.status_code == 200
+    
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert 'route="/widgets/view",status="200"' in response.text
+    assert "goal_id=123" not in render_metrics()
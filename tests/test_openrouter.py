@@ -1,7 +1,13 @@
+import json
 import pytest
+import httpx
+from contextlib import asynccontextmanager
+from unittest.mock import patch
 from fastapi.testclient import TestClient
 from main import app
 from app.config import get_config_value
+from app.metrics import llm_limiter_queue_depth, llm_limiter_wait_duration
+from app.services.openrouter import stream_request
 
 client = TestClient(app)
 
@@ -111,3 +117,262 @@ def test_openrouter_models_invalid_token():
     assert response.status_code == 403
     assert "Invalid API token" in response.json()["detail"]
 
+
+
+class _SSEBody(httpx.AsyncByteStream):
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+    
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+    
+    async def aclose(self):
+        self.closed = True
+
+
+def _mock_openrouter(handler):
+    @asynccontextmanager
+    async def fake_http_client(name):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as mock_client:
+            yield mock_client
+    
+    return patch.multiple(
+        "app.services.openrouter",
+        http_client=fake_http_client,
+        _get_api_key=lambda: "test-key"
+    )
+
+
+def test_openrouter_chat_completions_stream_passthrough():
+    chunks = [b'data: {"choices":[{"delta":{"content":"He"}}]}\n\n', b'data: {"choices":[{"delta":{"content":"llo"}}]}\n\n', b"data: [DONE]\n\n"]
+    
+    def handler(request):
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, stream=_SSEBody(chunks))
+    
+    with _mock_openrouter(handler), patch("app.routers.openrouter._get_api_token", return_value="token"):
+        response = client.post(
+            "/openrouter/chat/completions",
+            headers={"X-API-Token": "token"},
+            json={"model": "x-ai/grok-code-fast-1", "stream": True, "messages": [{"role": "user", "content": "hi"}]}
+        )
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.content == b"".join(chunks)
+
+
+@pytest.mark.asyncio
+async def test_stream_request_closes_upstream_when_client_stops_reading():
+    body = _SSEBody([b"data: 1\n\n", b"data: 2\n\n"])
+    
+    with _mock_openrouter(lambda request: httpx.Response(200, stream=body)):
+        upstream = await stream_request("chat/completions", {"stream": True})
+        chunks = upstream.iter_bytes()
+        assert await chunks.__anext__() == b"data: 1\n\n"
+        await chunks.aclose()
+    
+    assert body.closed
+
+
+@pytest.mark.asyncio
+async def test_stream_request_raises_on_upstream_error():
+    with _mock_openrouter(lambda request: httpx.Response(502, json={"error": "bad gateway"})):
+        with pytest.raises(httpx.HTTPStatusError):
+            await stream_request("chat/completions", {"stream": True})
+
+
+def _completion_payload(content="hi", temperature=0):
+    return {"model": "x-ai/grok-code-fast-1", "temperature": temperature, "messages": [{"role": "user", "content": content}]}
+
+
+def _completion_handler(calls):
+    def handler(request):
+        calls.append(request.url.path)
+        if request.url.path.endswith("/models"):
+            return httpx.Response(200, json={"data": [{"id": "x-ai/grok-code-fast-1"}]})
+        return httpx.Response(200, json={
+            "id": f"gen-{len(calls)}",
+            "object": "chat.completion",
+            "created": 1,
+            "model": "x-ai/grok-code-fast-1",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "Hello"}, "finish_reason": "stop"}]
+        })
+    return handler
+
+
+def test_openrouter_deterministic_completions_are_cached():
+    calls = []
+    headers = {"X-API-Token": "token"}
+    
+    with _mock_openrouter(_completion_handler(calls)), \
+            patch("app.routers.openrouter._get_api_token", return_value="token"), \
+            patch("app.services.openrouter._is_response_cache_enabled", return_value=True):
+        miss = client.post("/openrouter/chat/completions", headers=headers, json=_completion_payload())
+        hit = client.post("/openrouter/chat/completions", headers=headers, json=_completion_payload())
+        bypass = client.post("/openrouter/chat/completions", headers={**headers, "Cache-Control": "no-cache"}, json=_completion_payload())
+        sampled = client.post("/openrouter/chat/completions", headers=headers, json=_completion_payload(temperature=0.7))
+    
+    assert [miss.headers["X-Cache"], hit.headers["X-Cache"], bypass.headers["X-Cache"], sampled.headers["X-Cache"]] == ["MISS", "HIT", "BYPASS", "BYPASS"]
+    assert hit.json()["id"] == miss.json()["id"]
+    assert len(calls) == 3
+
+
+def test_openrouter_models_list_is_cached():
+    calls = []
+    
+    with _mock_openrouter(_completion_handler(calls)), patch("app.routers.openrouter._get_api_token", return_value="token"):
+        first = client.get("/openrouter/models", headers={"X-API-Token": "token"})
+        second = client.get("/openrouter/models", headers={"X-API-Token": "token"})
+    
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json()["data"][0]["id"] == "x-ai/grok-code-fast-1"
+    assert len(calls) == 1
+
+
+def test_openrouter_generic_post_passes_raw_bytes_through():
+    raw_request = b'{"model":"x-ai/grok-code-fast-1","input":"\xd0\xbf\xd1\x80\xd0\xb8\xd0\xb2\xd0\xb5\xd1\x82"}'
+    raw_reply = b'{"id":"emb-1","data":[{"embedding":[0.1,0.2]}]}'
+    seen = {}
+    
+    def handler(request):
+        seen["body"] = request.content
+        seen["content_type"] = request.headers["content-type"]
+        return httpx.Response(200, headers={"content-type": "application/json"}, content=raw_reply)
+    
+    with _mock_openrouter(handler), patch("app.routers.openrouter._get_api_token", return_value="token"):
+        with patch("json.loads", side_effect=AssertionError("тело запроса не должно разбираться")):
+            response = client.post(
+                "/openrouter/embeddings",
+                headers={"X-API-Token": "token", "Content-Type": "application/json", "X-Model": "x-ai/grok-code-fast-1"},
+                content=raw_request
+            )
+            untagged = client.post(
+                "/openrouter/embeddings",
+                headers={"X-API-Token": "token", "Content-Type": "application/json"},
+                content=raw_request
+            )
+        stats = client.get("/openrouter/limiter/stats", headers={"X-API-Token": "token"}).json()
+    
+    assert response.status_code == 200
+    assert untagged.status_code == 200
+    assert response.content == raw_reply
+    assert seen == {"body": raw_request, "content_type": "application/json"}
+    assert stats["x-ai/grok-code-fast-1"]["admitted"] == 1
+    assert stats["default"]["admitted"] == 1
+
+
+def test_openrouter_generic_get_keeps_upstream_status():
+    def handler(request):
+        return httpx.Response(404, headers={"content-type": "application/json"}, content=b'{"error":"not found"}')
+    
+    with _mock_openrouter(handler), patch("app.routers.openrouter._get_api_token", return_value="token"):
+        response = client.get("/openrouter/generation", headers={"X-API-Token": "token"}, params={"id": "gen-1"})
+    
+    assert response.status_code == 404
+    assert response.json() == {"error": "not found"}
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_queues_beyond_limit_and_rejects_after_max_wait():
+    import asyncio
+    from app.services.llm_limiter import AdaptiveLimiter, Permit, UpstreamRateLimitError
+    
+    limiter = AdaptiveLimiter(initial_limit=1, max_wait_seconds=0.05)
+    await limiter.acquire()
+    
+    waiting = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 1
+    
+    permit = Permit()
+    permit.record(200)
+    limiter.release(permit)
+    await waiting
+    assert limiter.in_flight == 1
+    assert limiter.limit == 2
+    
+    await limiter.acquire()
+    with pytest.raises(UpstreamRateLimitError):
+        await limiter.acquire()
+    assert limiter.stats()["rejected"] == 1
+    assert llm_limiter_wait_duration.count("default") == 3
+    assert llm_limiter_queue_depth.value("default") == 0
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_keeps_a_single_wake_timer():
+    import asyncio
+    from app.services.llm_limiter import AdaptiveLimiter, Permit
+    
+    limiter = AdaptiveLimiter(initial_limit=1, max_wait_seconds=1)
+    await limiter.acquire()
+    permit = Permit()
+    permit.record(429, "0.05")
+    limiter.release(permit)
+    
+    waiting = [asyncio.ensure_future(limiter.acquire()) for _ in range(3)]
+    await asyncio.sleep(0)
+    timer = limiter._timer
+    assert timer is not None
+    limiter._wake()
+    assert limiter._timer is timer
+    
+    await waiting[0]
+    assert limiter.in_flight == 1
+    for task in waiting[1:]:
+        task.cancel()
+    await asyncio.gather(*waiting[1:], return_exceptions=True)
+    assert limiter.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_measures_latency_to_first_byte():
+    import asyncio
+    from app.services.llm_limiter import AdaptiveLimiter, Permit
+    
+    limiter = AdaptiveLimiter(initial_limit=4, latency_target_seconds=0.02)
+    await limiter.acquire()
+    permit = Permit()
+    permit.record(200)
+    await asyncio.sleep(0.05)
+    limiter.release(permit)
+    
+    assert limiter.limit == 4.25
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_backs_off_on_429_and_honours_retry_after():
+    from app.services.llm_limiter import AdaptiveLimiter, Permit, UpstreamRateLimitError
+    
+    limiter = AdaptiveLimiter(initial_limit=8, max_wait_seconds=1)
+    await limiter.acquire()
+    permit = Permit()
+    permit.record(429, "30")
+    limiter.release(permit)
+    
+    assert limiter.limit == 4
+    assert limiter.stats()["blocked_for_seconds"] > 29
+    with pytest.raises(UpstreamRateLimitError) as error:
+        await limiter.acquire()
+    assert error.value.retry_after > 29
+
+
+def test_openrouter_upstream_429_is_reported_as_429():
+    def handler(request):
+        return httpx.Response(429, headers={"retry-after": "7"}, json={"error": "rate limited"})
+    
+    with _mock_openrouter(handler), patch("app.routers.openrouter._get_api_token", return_value="token"):
+        response = client.post(
+            "/openrouter/chat/completions",
+            headers={"X-API-Token": "token"},
+            json=_completion_payload(temperature=0.5)
+        )
+        stats = client.get("/openrouter/limiter/stats", headers={"X-API-Token": "token"}).json()
+    
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+    assert stats["x-ai/grok-code-fast-1"]["throttled"] == 1
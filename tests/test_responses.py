@@ -0,0 +1,82 @@
+import json
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.models.flights import Flight, FlightListResponse
+from app.models.weather import WeatherResponse, DayWeather
+from app.responses import FastJSONResponse, json_response, _has_non_finite
+
+
+def _flight_list() -> FlightListResponse:
+    return FlightListResponse(
+        flights=[
+            Flight(
+                flight_id="f1",
+                flight_number="SU 100",
+                origin="Шереметьево",
+                destination="LED",
+                scheduled_time=datetime(2025, 1, 15, 10, 0),
+                status="scheduled"
+            )
+        ],
+        total=1
+    )
+
+
+def test_fast_json_response_matches_default_encoding():
+    model = _flight_list()
+    
+    fast = FastJSONResponse(model)
+    default = JSONResponse(jsonable_encoder(model))
+    
+    assert json.loads(fast.body) == json.loads(default.body)
+    assert "Шереметьево".encode("utf-8") in fast.body
+
+
+def test_fast_json_response_encodes_plain_dicts():
+    response = FastJSONResponse({"message": "Обновление запущено", "items": [1, 2]})
+    assert json.loads(response.body) == {"message": "Обновление запущено", "items": [1, 2]}
+
+
+def test_fast_json_response_accepts_non_string_keys():
+    response = FastJSONResponse({1: "один", "total": None})
+    assert response.body == JSONResponse({1: "один", "total": None}).body
+
+
+def test_fast_json_response_rejects_nan_like_default_response():
+    content = {"temperature": float("nan"), "city": None}
+    
+    with pytest.raises(ValueError, match="Out of range float"):
+        JSONResponse(content)
+    with pytest.raises(ValueError, match="Out of range float"):
+        FastJSONResponse(content)
+
+
+def test_fast_json_response_rejects_nan_in_nested_payloads():
+    model = WeatherResponse(city="Москва", days=[DayWeather(date="2025-01-01", temperature_max=float("inf"))])
+    
+    with pytest.raises(ValueError, match="Out of range float"):
+        JSONResponse(jsonable_encoder(model))
+    with pytest.raises(ValueError, match="Out of range float"):
+        FastJSONResponse(model)
+    with pytest.raises(ValueError, match="Out of range float"):
+        FastJSONResponse({"items": [{"city": None, "values": [1.5, float("nan")]}]})
+
+
+def test_fast_json_response_skips_nan_scan_for_models_without_floats():
+    with patch("app.responses._has_non_finite", wraps=_has_non_finite) as scan:
+        response = FastJSONResponse(_flight_list())
+    
+    assert scan.call_count == 1
+    assert json.loads(response.body)["flights"][0]["gate"] is None
+
+
+def test_json_response_falls_back_when_disabled():
+    with patch("app.responses.is_fast_json_enabled", return_value=False):
+        response = json_response(_flight_list(), headers={"X-Cache": "HIT"})
+    
+    assert not isinstance(response, FastJSONResponse)
+    assert response.headers["X-Cache"] == "HIT"
+    assert json.loads(response.body)["total"] == 1
@@ -168,3 +168,98 @@ async def test_get_route_map_invalid_coordinates():
     assert isinstance(map_url, str)
     assert "static.maps.2gis.com" in map_url
 
+
+
+@pytest.mark.asyncio
+async def test_search_hotels_fetches_photos_concurrently_and_caches_them():
+    import asyncio
+    from unittest.mock import patch, AsyncMock, MagicMock
+    
+    catalog_response = MagicMock()
+    catalog_response.status_code = 200
+    catalog_response.json = MagicMock(return_value={
+        "result": {
+            "items": [
+                {"id": f"hotel-{i}", "name": f"Отель {i}", "flags": {"photos": i != 3}}
+                for i in range(5)
+            ]
+        }
+    })
+    in_flight = 0
+    max_in_flight = 0
+    photo_calls = []
+    
+    async def fake_get(url, params=None):
+        nonlocal in_flight, max_in_flight
+        if not url.endswith("/byid"):
+            return catalog_response
+        photo_calls.append(params["id"])
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        photos_response = MagicMock()
+        photos_response.status_code = 200
+        photos_response.json = MagicMock(return_value={
+            "result": {"items": [{"photos": [{"url": f"/{params['id']}.jpg"}]}]}
+        })
+        return photos_response
+    
+    with patch("app.services.twogis._get_api_key", return_value="key"), \
+            patch("app.services.twogis._get_city_coordinates", AsyncMock(return_value=(55.75, 37.61))), \
+            patch("app.services.twogis.http_client") as mock_client:
+        mock_client.return_value.__aenter__.return_value.get = fake_get
+        
+        hotels = await search_hotels("Москва")
+        await search_hotels("Москва")
+    
+    assert sorted(photo_calls) == ["hotel-0", "hotel-1", "hotel-2", "hotel-4"]
+    assert max_in_flight > 1
+    assert hotels[0].photos == ["https://photo.2gis.com/hotel-0.jpg"]
+    assert hotels[3].photos is None
+
+
+@pytest.mark.asyncio
+async def test_get_cached_hotels_serves_stale_and_refreshes_in_background():
+    import asyncio
+    from unittest.mock import patch, AsyncMock
+    from app.models.twogis import Hotel
+    from app.services import twogis
+    
+    search = AsyncMock(side_effect=[
+        [Hotel(id="1", name="Старый")],
+        [Hotel(id="2", name="Новый")],
+    ])
+    
+    with patch("app.services.twogis.search_hotels", search):
+        first = await twogis.get_cached_hotels("Москва")
+        cached = await twogis.get_cached_hotels(" москва ")
+        
+        twogis._hotels_cache.set("москва", first.hotels, ttl=0)
+        stale = await twogis.get_cached_hotels("Москва")
+        await asyncio.gather(*twogis._background_refreshes)
+        
+        fresh = await twogis.get_cached_hotels("Москва")
+    
+    assert first.cache_status == "MISS"
+    assert cached.cache_status == "HIT"
+    assert stale.cache_status == "STALE"
+    assert stale.hotels[0].name == "Старый"
+    assert fresh.hotels[0].name == "Новый"
+    assert search.call_count == 2
+
+
+def test_get_hotels_endpoint_reports_cache_headers():
+    from unittest.mock import patch, AsyncMock
+    from app.models.twogis import Hotel
+    
+    search = AsyncMock(return_value=[Hotel(id="1", name="Отель")])
+    with patch("app.services.twogis.search_hotels", search):
+        miss = client.get("/twogis/hotels", params={"city": "Казань"})
+        hit = client.get("/twogis/hotels", params={"city": "Казань"})
+    
+    assert miss.headers["X-Cache"] == "MISS"
+    assert hit.headers["X-Cache"] == "HIT"
+    assert int(hit.headers["Age"]) >= 0
+    assert hit.json()["total"] == 1
+    assert search.call_count == 1
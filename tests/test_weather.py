@@ -24,7 +24,7 @@ async def test_get_city_coordinates_success():
     })
     mock_response.raise_for_status = MagicMock()
     
-    with patch("app.services.openmeteo.httpx.AsyncClient") as mock_client:
+    with patch("app.services.openmeteo.http_client") as mock_client:
         mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
         
         lat, lon = await _get_city_coordinates("Moscow")
@@ -39,7 +39,7 @@ async def test_get_city_coordinates_city_not_found():
     mock_response.json = MagicMock(return_value={"results": []})
     mock_response.raise_for_status = MagicMock()
     
-    with patch("app.services.openmeteo.httpx.AsyncClient") as mock_client:
+    with patch("app.services.openmeteo.http_client") as mock_client:
         mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
         
         with pytest.raises(ValueError, match="не найден"):
@@ -61,7 +61,7 @@ async def test_get_city_coordinates_missing_coordinates():
     })
     mock_response.raise_for_status = MagicMock()
     
-    with patch("app.services.openmeteo.httpx.AsyncClient") as mock_client:
+    with patch("app.services.openmeteo.http_client") as mock_client:
         mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
         
         with pytest.raises(ValueError, match="Не удалось получить координаты"):
@@ -99,7 +99,7 @@ async def test_get_weather_by_city_and_dates_success():
     weather_response.status_code = 200
     weather_response.raise_for_status = MagicMock()
     
-    with patch("app.services.openmeteo.httpx.AsyncClient") as mock_client:
+    with patch("app.services.openmeteo.http_client") as mock_client:
         mock_get = AsyncMock(side_effect=[geocoding_response, weather_response])
         mock_client.return_value.__aenter__.return_value.get = mock_get
         
@@ -150,7 +150,7 @@ async def test_get_weather_by_city_and_dates_past_dates():
     })
     geocoding_response.raise_for_status = MagicMock()
     
-    with patch("app.services.openmeteo.httpx.AsyncClient") as mock_client:
+    with patch("app.services.openmeteo.http_client") as mock_client:
         mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=geocoding_response)
         
         with pytest.raises(ValueError, match="прошлом"):
@@ -182,7 +182,7 @@ async def test_get_weather_by_city_and_dates_weather_api_error():
         "reason": "Invalid date range"
     })
     
-    with patch("app.services.openmeteo.httpx.AsyncClient") as mock_client:
+    with patch("app.services.openmeteo.http_client") as mock_client:
         mock_get = AsyncMock(side_effect=[geocoding_response, weather_response])
         mock_client.return_value.__aenter__.return_value.get = mock_get
         
@@ -221,7 +221,7 @@ async def test_get_weather_by_city_and_dates_missing_temperature_data():
     weather_response.status_code = 200
     weather_response.raise_for_status = MagicMock()
     
-    with patch("app.services.openmeteo.httpx.AsyncClient") as mock_client:
+    with patch("app.services.openmeteo.http_client") as mock_client:
         mock_get = AsyncMock(side_effect=[geocoding_response, weather_response])
         mock_client.return_value.__aenter__.return_value.get = mock_get
         
@@ -264,7 +264,7 @@ async def test_get_weather_by_city_and_dates_unknown_weather_code():
     weather_response.status_code = 200
     weather_response.raise_for_status = MagicMock()
     
-    with patch("app.services.openmeteo.httpx.AsyncClient") as mock_client:
+    with patch("app.services.openmeteo.http_client") as mock_client:
         mock_get = AsyncMock(side_effect=[geocoding_response, weather_response])
         mock_client.return_value.__aenter__.return_value.get = mock_get
         
@@ -303,7 +303,7 @@ def test_get_weather_endpoint_success():
     weather_response.status_code = 200
     weather_response.raise_for_status = MagicMock()
     
-    with patch("app.services.openmeteo.httpx.AsyncClient") as mock_client:
+    with patch("app.services.openmeteo.http_client") as mock_client:
         mock_get = AsyncMock(side_effect=[geocoding_response, weather_response])
         mock_client.return_value.__aenter__.return_value.get = mock_get
         
@@ -368,7 +368,7 @@ def test_get_weather_endpoint_city_not_found():
     geocoding_response.json = MagicMock(return_value={"results": []})
     geocoding_response.raise_for_status = MagicMock()
     
-    with patch("app.services.openmeteo.httpx.AsyncClient") as mock_client:
+    with patch("app.services.openmeteo.http_client") as mock_client:
         mock_get = AsyncMock(return_value=geocoding_response)
         mock_client.return_value.__aenter__.return_value.get = mock_get
         
@@ -395,7 +395,7 @@ def test_get_weather_endpoint_past_dates():
     })
     geocoding_response.raise_for_status = MagicMock()
     
-    with patch("app.services.openmeteo.httpx.AsyncClient") as mock_client:
+    with patch("app.services.openmeteo.http_client") as mock_client:
         mock_get = AsyncMock(return_value=geocoding_response)
         mock_client.return_value.__aenter__.return_value.get = mock_get
         
@@ -435,7 +435,7 @@ def test_get_weather_endpoint_response_structure():
     weather_response.status_code = 200
     weather_response.raise_for_status = MagicMock()
     
-    with patch("app.services.openmeteo.httpx.AsyncClient") as mock_client:
+    with patch("app.services.openmeteo.http_client") as mock_client:
         mock_get = AsyncMock(side_effect=[geocoding_response, weather_response])
         mock_client.return_value.__aenter__.return_value.get = mock_get
         
@@ -457,3 +457,76 @@ def test_get_weather_endpoint_response_structure():
         assert day["temperature_min"] == 5.0
         assert day["temperature_avg"] == 8.75
         assert isinstance(day["condition"], str)
+
+
+def _forecast_responses(days: int = 16):
+    today = date.today()
+    geocoding_response = MagicMock()
+    geocoding_response.json = MagicMock(return_value={
+        "results": [{"name": "Moscow", "latitude": 55.7558, "longitude": 37.6173}]
+    })
+    geocoding_response.raise_for_status = MagicMock()
+    
+    weather_response = MagicMock()
+    weather_response.status_code = 200
+    weather_response.json = MagicMock(return_value={
+        "daily": {
+            "time": [(today + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)],
+            "temperature_2m_max": [20.0 + i for i in range(days)],
+            "temperature_2m_min": [10.0 + i for i in range(days)],
+            "weathercode": [0] * days
+        }
+    })
+    weather_response.raise_for_status = MagicMock()
+    return geocoding_response, weather_response
+
+
+@pytest.mark.asyncio
+async def test_get_weather_serves_subranges_from_cached_forecast():
+    today = date.today()
+    geocoding_response, weather_response = _forecast_responses()
+    
+    with patch("app.services.openmeteo.http_client") as mock_client:
+        get = AsyncMock(side_effect=[geocoding_response, weather_response])
+        mock_client.return_value.__aenter__.return_value.get = get
+        
+        first = await get_weather_by_city_and_dates(
+            "Moscow", today.strftime("%Y-%m-%d"), (today + timedelta(days=2)).strftime("%Y-%m-%d")
+        )
+        second = await get_weather_by_city_and_dates(
+            "Moscow", (today + timedelta(days=5)).strftime("%Y-%m-%d"), (today + timedelta(days=6)).strftime("%Y-%m-%d")
+        )
+        
+        assert get.call_count == 2
+        assert get.call_args_list[1].kwargs["params"]["forecast_days"] == 16
+        assert len(first.days) == 3
+        assert [day.temperature_max for day in second.days] == [25.0, 26.0]
+
+
+@pytest.mark.asyncio
+async def test_get_weather_coalesces_concurrent_forecast_requests():
+    import asyncio
+    
+    today = date.today()
+    date_from = today.strftime("%Y-%m-%d")
+    date_to = (today + timedelta(days=3)).strftime("%Y-%m-%d")
+    geocoding_response, weather_response = _forecast_responses()
+    forecast_calls = 0
+    
+    async def fake_get(url, params=None):
+        nonlocal forecast_calls
+        if "forecast" not in url:
+            return geocoding_response
+        forecast_calls += 1
+        await asyncio.sleep(0.01)
+        return weather_response
+    
+    with patch("app.services.openmeteo.http_client") as mock_client:
+        mock_client.return_value.__aenter__.return_value.get = fake_get
+        
+        results = await asyncio.gather(*(
+            get_weather_by_city_and_dates("Moscow", date_from, date_to) for _ in range(10)
+        ))
+        
+        assert forecast_calls == 1
+        assert all(len(result.days) == 4 for result in results)
@@ -118,3 +118,117 @@ def test_widget_types():
     
     for widget in data["widgets"]:
         assert widget["type"] in allowed_types
+
+
+def test_widgets_view_substitutes_goal_context_and_dates():
+    from datetime import date, timedelta
+    
+    response = client.get("/widgets/view", params={"context": "travel", "goal_id": 'цель "1"'})
+    assert response.status_code == 200
+    data = response.json()
+    
+    today = date.today()
+    assert data["goal_id"] == 'цель "1"'
+    assert data["context"] == "travel"
+    assert data["widgets"][0]["datetime"] == f"{today.isoformat()}T10:00:00"
+    assert data["widgets"][-1]["group"] == (today + timedelta(days=1)).isoformat()
+    assert "@@" not in response.text
+
+
+def test_widgets_view_is_cached_per_day():
+    from datetime import date
+    from unittest.mock import patch
+    from app.routers import widgets
+    
+    first = widgets.render_widgets_view(None, "savings")
+    assert widgets.render_widgets_view(None, "savings") is first
+    
+    class NextDay(date):
+        @classmethod
+        def today(cls):
+            return date(2030, 1, 2)
+    
+    with patch("app.routers.widgets.date", NextDay):
+        rolled = widgets.render_widgets_view(None, "savings")
+    
+    assert rolled is not first
+    assert b"2030-01-02T10:00:00" in rolled
+
+
+@pytest.mark.asyncio
+async def test_live_travel_view_degrades_slow_sources_under_deadline():
+    import asyncio
+    import time
+    from unittest.mock import patch
+    from app.models.flights import Flight
+    from app.models.twogis import Hotel
+    from app.services import travel_view
+    
+    slow_release = asyncio.Event()
+    
+    async def fetch_flights(airports):
+        assert airports == ["LED"]
+        return [Flight(flight_id="f1", flight_number="SU 100", origin="SVO", destination="LED", status="scheduled")]
+    
+    async def fetch_hotels(city):
+        await slow_release.wait()
+        return [Hotel(id="h1", name="Астория", lat=59.93, lon=30.31)]
+    
+    async def fetch_weather(city, date_from, date_to):
+        raise ValueError("Ошибка API")
+    
+    with patch.object(travel_view, "_fetch_flights", fetch_flights), \
+            patch.object(travel_view, "_fetch_hotels", fetch_hotels), \
+            patch.object(travel_view, "get_weather_by_city_and_dates", fetch_weather), \
+            patch.object(travel_view, "_get_deadline_seconds", return_value=0.05), \
+            patch.object(travel_view, "_get_city_airports", return_value=["LED"]):
+        started_at = time.perf_counter()
+        first = await travel_view.build_live_travel_view("goal", "Санкт-Петербург")
+        elapsed = time.perf_counter() - started_at
+        
+        slow_release.set()
+        await asyncio.gather(*travel_view._background_fetches)
+        second = await travel_view.build_live_travel_view("goal", " санкт-петербург ")
+    
+    sources = {widget.id: widget.data["source"] for widget in first.widgets}
+    assert elapsed < 0.5
+    assert sources == {
+        "widget_flights": "live",
+        "widget_hotel_day1": "placeholder",
+        "widget_map_hotel": "placeholder",
+        "widget_weather": "placeholder",
+    }
+    assert first.widgets[0].items[0].text == "SU 100 SVO → LED"
+    
+    hotel_widget = next(widget for widget in second.widgets if widget.id == "widget_hotel_day1")
+    assert hotel_widget.data["source"] == "live"
+    assert hotel_widget.items[0].text == "Астория"
+
+
+@pytest.mark.asyncio
+async def test_live_travel_view_omits_flights_without_city_airports():
+    from unittest.mock import AsyncMock, patch
+    from app.services import travel_view
+    
+    fetch_flights = AsyncMock(return_value=[])
+    with patch.object(travel_view, "_fetch_flights", fetch_flights), \
+            patch.object(travel_view, "_fetch_hotels", AsyncMock(return_value=[])), \
+            patch.object(travel_view, "get_weather_by_city_and_dates", AsyncMock(return_value=None)), \
+            patch.object(travel_view, "_get_city_airports", return_value=[]):
+        view = await travel_view.build_live_travel_view("goal", "Казань")
+    
+    assert "widget_flights" not in [widget.id for widget in view.widgets]
+    fetch_flights.assert_not_awaited()
+
+
+def test_widgets_view_live_travel_endpoint():
+    from unittest.mock import patch, AsyncMock
+    from app.models.widgets import WidgetViewResponse
+    
+    live_view = WidgetViewResponse(view_id="travel_view_live", title="Поездка: Казань", context="travel", widgets=[])
+    with patch("app.routers.widgets.build_live_travel_view", AsyncMock(return_value=live_view)) as build:
+        response = client.get("/widgets/view", params={"context": "travel", "live": "true", "city": "Казань"})
+    
+    assert response.status_code == 200
+    assert response.json()["view_id"] == "travel_view_live"
+    build.assert_awaited_once_with(None, "Казань")
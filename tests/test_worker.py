@@ -0,0 +1,54 @@
+import asyncio
+import signal
+import pytest
+from unittest.mock import patch
+from app import worker
+
+
+@pytest.mark.asyncio
+async def test_ingestion_disabled_only_follows_snapshot():
+    with patch.object(worker, "is_ingestion_enabled", return_value=False), \
+            patch.object(worker, "start_background_tasks") as start_background_tasks:
+        tasks = worker.start_ingestion()
+        try:
+            assert len(tasks) == 1
+            start_background_tasks.assert_not_called()
+        finally:
+            await worker.stop_background_tasks(tasks)
+    
+    assert all(task.cancelled() for task in tasks)
+
+
+@pytest.mark.asyncio
+async def test_run_worker_once_runs_update_and_cleanup():
+    calls = []
+    
+    async def fake_update():
+        calls.append("update")
+    
+    async def fake_delete():
+        calls.append("delete")
+    
+    with patch.object(worker, "update_flights_data", fake_update), \
+            patch.object(worker, "delete_old_flights", fake_delete):
+        await worker.run_worker(once=True)
+    
+    assert calls == ["update", "delete"]
+    assert not asyncio.get_running_loop().remove_signal_handler(signal.SIGTERM)
+
+
+@pytest.mark.asyncio
+async def test_worker_coordinator_runs_ingestion_as_leader():
+    started = asyncio.Event()
+    
+    async def fake_update():
+        started.set()
+    
+    with patch.object(worker, "update_flights_data", fake_update), \
+            patch.object(worker, "get_lease_renew_seconds", return_value=0.01):
+        task = asyncio.create_task(worker.background_coordinator(sync_snapshot=False))
+        try:
+            await asyncio.wait_for(started.wait(), timeout=2)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)